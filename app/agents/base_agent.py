@@ -1,25 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union, AsyncGenerator
 from pydantic import BaseModel
 import logging
-from datetime import datetime
 
+from app.agents.memory import AgentMemory, estimate_tokens
+from app.agents.tool_calls import IncrementalToolCallParser, parse_json_tool_calls
+from app.core.config import settings
+from app.llm.admission import AdmissionRejected
 from app.llm.ollama_client import OllamaClient
 from app.tools.registry import tool_manager
 
 logger = logging.getLogger(__name__)
 
-class AgentMessage(BaseModel):
-    role: str  # "user", "assistant", "system", "tool"
-    content: str
-    metadata: Dict[str, Any] = {}
-    timestamp: datetime = None
-    
-    def __init__(self, **data):
-        super().__init__(**data)
-        if self.timestamp is None:
-            self.timestamp = datetime.now()
-
 class AgentResponse(BaseModel):
     content: str
     tool_calls: List[Dict[str, Any]] = []
@@ -33,54 +25,121 @@ class BaseAgent(ABC):
         self.name = name
         self.system_prompt = system_prompt
         self.llm_client = OllamaClient()
-        self.memory: List[AgentMessage] = []
+        self.memory = AgentMemory()
         
     def add_message(self, role: str, content: str, metadata: Dict[str, Any] = None):
         """Add a message to memory"""
-        self.memory.append(AgentMessage(
-            role=role,
-            content=content,
-            metadata=metadata or {}
-        ))
+        self.memory.add(role, content, metadata)
         
-    def get_context(self, limit: int = 10) -> List[Dict[str, str]]:
-        """Get recent context for LLM"""
-        return [
-            {"role": msg.role, "content": msg.content}
-            for msg in self.memory[-limit:]
-        ]
+    def get_context(
+        self,
+        limit: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        system_prompt: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Get recent context for LLM, filling a token budget rather than a fixed message count"""
+        if not settings.memory_enabled:
+            limit = 1  # only the current message
+        if token_budget is None:
+            token_budget = settings.context_token_budget - estimate_tokens(system_prompt or self.system_prompt)
+        return self.memory.build_context(token_budget, limit)
     
-    async def think(self, prompt: str, context: Dict[str, Any] = None) -> AgentResponse:
+    async def think(
+        self,
+        prompt: str,
+        context: Dict[str, Any] = None,
+        system_prompt: Optional[str] = None,
+        response_format: Optional[Union[str, Dict[str, Any]]] = None
+    ) -> AgentResponse:
         """Process input and generate response"""
-        self.add_message("user", prompt, context)
-        
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            *self.get_context()
-        ]
+        messages = self._prepare_messages(prompt, context, system_prompt)
         
         try:
-            response = await self.llm_client.chat(messages)
+            response = await self.llm_client.chat(messages, format=response_format)
             content = response.get("message", {}).get("content", "")
+            return self._finalize_response(content, structured=response_format is not None)
             
-            # Parse tool calls if present
-            tool_calls = self._parse_tool_calls(content)
-            
-            agent_response = AgentResponse(
-                content=content,
-                tool_calls=tool_calls,
-                confidence=0.8  # Could be enhanced with confidence scoring
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error(f"Agent thinking error: {e}")
+            return AgentResponse(
+                content=f"I encountered an error: {str(e)}",
+                confidence=0.0
             )
+    
+    async def think_stream(
+        self,
+        prompt: str,
+        context: Dict[str, Any] = None,
+        system_prompt: Optional[str] = None,
+        response_format: Optional[Union[str, Dict[str, Any]]] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream the response as token events, ending with a response event
+
+        Each tool call is also yielded as a tool_call event as soon as it is complete,
+        before the rest of the response arrives.
+        """
+        messages = self._prepare_messages(prompt, context, system_prompt)
+        parts: List[str] = []
+        parser = IncrementalToolCallParser(
+            structured=response_format is not None,
+            get_metadata=tool_manager.registry.get_metadata
+        )
+        
+        try:
+            async for chunk in self.llm_client.chat_stream(messages, format=response_format):
+                token = chunk.get("message", {}).get("content", "")
+                if token:
+                    parts.append(token)
+                    yield {"type": "token", "content": token}
+                    for tool_call in parser.feed(token):
+                        yield {"type": "tool_call", "call": tool_call}
             
-            self.add_message("assistant", content, {"tool_calls": tool_calls})
-            return agent_response
+            agent_response = self._finalize_response("".join(parts), structured=response_format is not None)
             
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Agent thinking error: {e}")
-            return AgentResponse(
+            agent_response = AgentResponse(
                 content=f"I encountered an error: {str(e)}",
                 confidence=0.0
             )
+        
+        yield {"type": "response", "response": agent_response}
+    
+    def _prepare_messages(
+        self,
+        prompt: str,
+        context: Dict[str, Any] = None,
+        system_prompt: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Record the prompt and build the message list for the LLM"""
+        self.add_message("user", prompt, context)
+        system_prompt = system_prompt or self.system_prompt
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            *self.get_context(system_prompt=system_prompt)
+        ]
+    
+    def _finalize_response(self, content: str, structured: bool = False) -> AgentResponse:
+        """Parse tool calls from a completed response and record it"""
+        tool_calls = None
+        if structured:
+            tool_calls = parse_json_tool_calls(content, tool_manager.registry.get_metadata)
+        if tool_calls is None:
+            tool_calls = self._parse_tool_calls(content)
+        
+        agent_response = AgentResponse(
+            content=content,
+            tool_calls=tool_calls,
+            confidence=0.8  # Could be enhanced with confidence scoring
+        )
+        
+        self.add_message("assistant", content, {"tool_calls": tool_calls})
+        return agent_response
     
     def _parse_tool_calls(self, content: str) -> List[Dict[str, Any]]:
         """Parse tool calls from agent response"""
@@ -1,11 +1,25 @@
+import asyncio
 import json
 import logging
-from typing import Dict, Any, List
+import os
+from typing import Dict, Any, List, Optional, Tuple, AsyncGenerator, TYPE_CHECKING
 from app.agents.base_agent import BaseAgent, AgentResponse
+from app.agents.question_parser import split_questions
+from app.agents.result_digest import digest_tool_results
+from app.agents.tool_calls import JSON_TOOL_CALL_INSTRUCTIONS, tool_call_schema
+from app.agents.tool_scheduler import ToolScheduler
+from app.core.config import settings
+from app.tools.base_tool import ToolMetadata
 from app.tools.registry import tool_manager
+from app.utils.file_handler import FileHandler
+
+if TYPE_CHECKING:
+    from app.agents.fast_path import FastPathAnswer
 
 logger = logging.getLogger(__name__)
 
+DATA_EXTENSIONS = ['.csv', '.xlsx', '.json', '.parquet']
+
 class DataAnalystAgent(BaseAgent):
     """Main agent for data analysis tasks"""
     
@@ -14,98 +28,260 @@ class DataAnalystAgent(BaseAgent):
             name="DataAnalystAgent",
             system_prompt="""You are an expert data analyst agent. You can understand natural language requests and use various tools to analyze data, create visualizations, scrape web data, and provide insights.
 
-Available tools:
-- load_data: Load data from files (CSV, Excel, JSON, Parquet)
-- analyze_data: Perform statistical analysis and generate insights
-- visualize_data: Create charts and visualizations
-- scrape_web: Extract data from web pages
-- query_data: Query and filter datasets
-- describe_data: Get data overview and statistics
-
 When given a request:
 1. Understand what the user wants to achieve
 2. Determine which tools are needed
 3. Use tools with appropriate parameters
 4. Provide comprehensive analysis and insights
-5. Explain your reasoning and findings
-
-Use @tool_name(parameters) format to call tools."""
+5. Explain your reasoning and findings"""
         )
         
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process data analysis request"""
+        result: Dict[str, Any] = {}
+        async for event in self.process_stream(input_data):
+            if event["type"] == "result":
+                result = event["result"]
+        return result
+    
+    async def process_stream(self, input_data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Process data analysis request, yielding progress events as they happen"""
         user_request = input_data.get("request", "")
         files = input_data.get("files", {})
         
+        # Answer well-formed statistical questions directly, without the LLM
+        fast_answers, unanswered = await self._answer_fast_path(
+            user_request, files, input_data.get("questions")
+        )
+        if fast_answers and not unanswered:
+            yield {"type": "status", "stage": "fast_path"}
+            analysis = "\n".join(f"{a.question} {a.answer}" for a in fast_answers)
+            yield {"type": "result", "result": self._build_result(user_request, analysis, [], files, fast_answers)}
+            return
+        
+        llm_request = user_request
+        if fast_answers:
+            computed = "\n".join(f"- {a.question} {a.answer}" for a in fast_answers)
+            llm_request = f"{user_request}\n\nAlready computed (use these values, do not recompute):\n{computed}"
+        
         # Build context
         context = {
             "available_files": list(files.keys()),
             "user_request": user_request
         }
         
-        # Get agent response
-        response = await self.think(user_request, context)
+        # Get agent response, starting each tool call as soon as it has streamed in
+        yield {"type": "status", "stage": "planning"}
+        response = None
+        tools = self._planning_tools(llm_request)
+        profiles = await self._data_profiles(files)
+        if profiles:
+            llm_request = f"{llm_request}\n\n{profiles}"
+        structured = settings.tool_call_format == "json"
+        system_prompt = self._planning_prompt(tools, structured)
+        response_format = tool_call_schema(tools) if structured else None
+        scheduler = ToolScheduler()
+        dispatched: List[str] = []
         
-        # Execute any tool calls
-        results = []
-        for tool_call in response.tool_calls:
-            tool_name = tool_call.get("tool")
-            parameters = tool_call.get("parameters", {})
+        try:
+            async for event in self.think_stream(llm_request, context, system_prompt, response_format):
+                if event["type"] == "token":
+                    yield {"type": "token", "phase": "plan", "content": event["content"]}
+                elif event["type"] == "tool_call":
+                    if self._submit_tool_call(scheduler, event["call"], files):
+                        dispatched.append(self._call_key(event["call"]))
+                elif event["type"] == "response":
+                    response = event["response"]
+                for scheduler_event in scheduler.pending_events():
+                    yield scheduler_event
+            
+            # Run any calls only the full parse of the response found
+            for tool_call in response.tool_calls:
+                key = self._call_key(tool_call)
+                if key in dispatched:
+                    dispatched.remove(key)
+                else:
+                    self._submit_tool_call(scheduler, tool_call, files)
             
-            tool = tool_manager.registry.get_tool(tool_name)
-            if tool:
-                if files and "file_path" not in parameters:
-                    # Auto-detect file to use
-                    for filename, filepath in files.items():
-                        if any(ext in filename.lower() for ext in ['.csv', '.xlsx', '.json']):
-                            parameters["file_path"] = filepath
-                            break
-                
-                result = await tool.execute(parameters)
-                results.append({
-                    "tool": tool_name,
-                    "parameters": parameters,
-                    "result": result.dict()
-                })
+            async for event in scheduler.events():
+                yield event
+        finally:
+            await scheduler.cancel()
+        results = scheduler.results()
         
         # Generate final response
-        final_response = await self._generate_final_response(
-            user_request, results, files
-        )
+        yield {"type": "status", "stage": "summarizing"}
+        final_response = ""
+        async for event in self._stream_final_response(user_request, results, files, input_data.get("answer_format")):
+            if event["type"] == "token":
+                yield {"type": "token", "phase": "summary", "content": event["content"]}
+            elif event["type"] == "response":
+                final_response = event["response"].content
         
+        yield {"type": "result", "result": self._build_result(user_request, final_response, results, files, fast_answers)}
+    
+    def _submit_tool_call(self, scheduler: ToolScheduler, tool_call: Dict[str, Any], files: Dict[str, Any]) -> bool:
+        """Schedule a parsed tool call if the tool exists"""
+        tool_name = tool_call.get("tool")
+        tool = tool_manager.registry.get_tool(tool_name)
+        if not tool:
+            return False
+        parameters = self._resolve_parameters(dict(tool_call.get("parameters", {})), files)
+        scheduler.submit(tool, tool_name, parameters)
+        return True
+    
+    def _call_key(self, tool_call: Dict[str, Any]) -> str:
+        return json.dumps([tool_call.get("tool"), tool_call.get("parameters", {})], sort_keys=True, default=str)
+    
+    def _planning_tools(self, request: str) -> List[ToolMetadata]:
+        """The tools most relevant to the request"""
+        top_k = settings.prompt_tool_top_k
+        registry = tool_manager.registry
+        return registry.search_tools(request, top_k) or registry.list_tools()[:top_k]
+    
+    def _planning_prompt(self, tools: List[ToolMetadata], structured: bool) -> str:
+        """System prompt listing only the given tools and how to call them"""
+        if not tools:
+            return self.system_prompt
+        call_format = JSON_TOOL_CALL_INSTRUCTIONS if structured else "Use @tool_name(parameters) format to call tools."
+        tool_list = "\n".join(self._describe_tool(metadata) for metadata in tools)
+        return f"{self.system_prompt}\n\n{call_format}\n\nAvailable tools:\n{tool_list}"
+    
+    def _describe_tool(self, metadata: ToolMetadata) -> str:
+        """One tool with its parameter schema, compactly"""
+        schema = {"type": "object", "properties": metadata.parameters, "required": metadata.required}
+        lines = [
+            f"- {metadata.name}: {metadata.description}",
+            f"  parameters: {json.dumps(schema, separators=(',', ':'))}"
+        ]
+        if metadata.examples:
+            lines.append(f"  example: {metadata.examples[0]}")
+        return "\n".join(lines)
+    
+    def _build_result(
+        self,
+        user_request: str,
+        analysis: str,
+        results: List[Dict[str, Any]],
+        files: Dict[str, Any],
+        fast_answers: List["FastPathAnswer"]
+    ) -> Dict[str, Any]:
+        """Assemble the response returned to the API"""
         return {
             "request": user_request,
-            "analysis": final_response,
+            "analysis": analysis,
+            "answers": [answer.dict() for answer in fast_answers],
             "tool_results": results,
             "metadata": {
                 "agent": self.name,
                 "tools_used": len(results),
-                "files_processed": len(files)
+                "files_processed": len(files),
+                "fast_path_answers": len(fast_answers)
             }
         }
     
-    async def _generate_final_response(
+    async def _answer_fast_path(
+        self,
+        user_request: str,
+        files: Dict[str, Any],
+        questions: Optional[List[str]] = None
+    ) -> Tuple[List["FastPathAnswer"], List[str]]:
+        """Split the request into questions and answer the recognizable ones directly"""
+        questions = questions or split_questions(user_request)
+        if not questions and len(user_request) <= 200 and "\n" not in user_request.strip():
+            questions = [user_request.strip()]
+        
+        data_file = self._primary_data_file(files)
+        if not settings.fast_path_enabled or not questions or not data_file:
+            return [], questions
+        
+        filename, file_path = data_file
+        try:
+            df = await FileHandler().load_data_file(file_path, os.path.splitext(filename)[1][1:].lower())
+        except Exception as e:
+            logger.warning(f"Fast path could not load {filename}: {e}")
+            return [], questions
+        
+        from app.agents.fast_path import FastPathMatcher  # pandas-heavy, imported on first use
+        
+        matcher = FastPathMatcher(df)
+        matches = await asyncio.to_thread(lambda: [matcher.match(question) for question in questions])
+        answered = [match for match in matches if match is not None]
+        unanswered = [question for question, match in zip(questions, matches) if match is None]
+        return answered, unanswered
+    
+    async def _data_profiles(self, files: Dict[str, Any]) -> Optional[str]:
+        """Profiles of the uploaded data files, so the plan needs no exploratory tool call"""
+        from app.utils.dataset_profile import dataset_profiler
+        
+        data_files = [
+            (filename, file_path) for filename, file_path in files.items()
+            if isinstance(file_path, str) and any(ext in filename.lower() for ext in DATA_EXTENSIONS)
+        ]
+        if not data_files:
+            return None
+        try:
+            profiles = await asyncio.wait_for(
+                asyncio.gather(*(dataset_profiler.get(file_path, filename) for filename, file_path in data_files)),
+                settings.dataset_profile_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.info("Planning without dataset profiles; profiling is still running")
+            return None
+        sections = [profile.to_prompt(filename) for (filename, _), profile in zip(data_files, profiles) if profile]
+        return "\n\n".join(sections) or None
+    
+    def _primary_data_file(self, files: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """First uploaded data file as (filename, path)"""
+        for filename, filepath in files.items():
+            if any(ext in filename.lower() for ext in DATA_EXTENSIONS):
+                return filename, filepath
+        return None
+    
+    def _resolve_parameters(self, parameters: Dict[str, Any], files: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in the data file for tool calls that did not name one"""
+        if files and "file_path" not in parameters:
+            # Auto-detect file to use
+            data_file = self._primary_data_file(files)
+            if data_file:
+                parameters["file_path"] = data_file[1]
+        return parameters
+    
+    async def _stream_final_response(
         self, 
         original_request: str, 
         tool_results: List[Dict[str, Any]], 
-        files: Dict[str, Any]
-    ) -> str:
-        """Generate final analysis based on tool results"""
+        files: Dict[str, Any],
+        answer_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream the final analysis based on tool results
+
+        With `answer_format` (a JSON schema) the model answers with a JSON object
+        holding the answer instead of a prose summary.
+        """
         
         context = {
             "original_request": original_request,
-            "tool_results": tool_results,
+            "tools_used": [result["tool"] for result in tool_results],
             "files_processed": list(files.keys())
         }
         
         summary_prompt = f"""
 Based on the analysis performed, provide a comprehensive summary of findings.
 Original request: {original_request}
-Tool results: {json.dumps(tool_results, indent=2)}
+Tool results: {digest_tool_results(tool_results)}
 Files processed: {list(files.keys())}
 
 Provide insights, key findings, and actionable recommendations.
+"""
+        if answer_format is not None:
+            summary_prompt = f"""
+Answer the question using the tool results.
+Question: {original_request}
+Tool results: {digest_tool_results(tool_results)}
+
+Respond with a JSON object: {{"answer": <the answer only, no units or prose>, "explanation": "<one sentence>"}}
 """
         
-        response = await self.think(summary_prompt, context)
-        return response.content
+        async for event in self.think_stream(summary_prompt, context, response_format=answer_format):
+            yield event
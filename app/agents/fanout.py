@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Any, List, Optional
+from app.agents.data_analyst_agent import DataAnalystAgent
+from app.agents.question_parser import split_questions, parse_response_keys, question_preamble
+from app.core.config import settings
+from app.llm.admission import AdmissionRejected, request_deadline
+
+logger = logging.getLogger(__name__)
+
+IMAGE_WORDS = ("base64", "png", "image")
+
+async def answer_questions(
+    questions_content: str,
+    files: Dict[str, Any],
+    question_timeout: float = None
+) -> Optional[Dict[str, Any]]:
+    """Answer each numbered question as its own sub-task and assemble the requested keys
+
+    Every question gets a fresh agent and its own time budget, so a slow question only
+    loses its own answer. Sub-tasks share the uploaded files, and therefore the parsed
+    dataset through the dataset cache. Returns None when the request has fewer than two
+    numbered questions.
+    """
+    questions = split_questions(questions_content)
+    if len(questions) < 2:
+        return None
+
+    timeout = question_timeout or settings.question_timeout
+    preamble = question_preamble(questions_content)
+    keys = parse_response_keys(questions_content)
+    if len(keys) != len(questions):
+        if keys:
+            logger.warning(
+                f"Found {len(keys)} response keys for {len(questions)} questions; answering as answer_1..answer_{len(questions)}"
+            )
+        keys = [(f"answer_{i + 1}", "") for i in range(len(questions))]
+
+    async def run(question: str, value_type: str) -> Dict[str, Any]:
+        agent = DataAnalystAgent()
+        request = f"{preamble}\n\n{question}" if preamble else question
+        with request_deadline(timeout):
+            return await asyncio.wait_for(
+                agent.process({
+                    "request": request,
+                    "files": files,
+                    "questions": [question],
+                    "answer_format": answer_schema(value_type)
+                }),
+                timeout=timeout
+            )
+
+    outcomes = await asyncio.gather(
+        *(run(question, value_type) for question, (_, value_type) in zip(questions, keys)),
+        return_exceptions=True
+    )
+    if all(isinstance(outcome, AdmissionRejected) for outcome in outcomes):
+        # Nothing was answered; let the caller tell the client to come back later
+        raise outcomes[0]
+
+    response: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for (key, value_type), question, outcome in zip(keys, questions, outcomes):
+        if isinstance(outcome, BaseException):
+            error = "Task timed out" if isinstance(outcome, asyncio.TimeoutError) else str(outcome)
+            logger.warning(f"Question failed ({key}): {error}")
+            response[key] = None
+            errors[key] = error
+        else:
+            response[key] = extract_answer(outcome, value_type)
+
+    if errors:
+        response["errors"] = errors
+    return response
+
+def answer_schema(value_type: str = "") -> Optional[Dict[str, Any]]:
+    """JSON schema for a sub-agent's final answer, or None for images (taken from tool output)"""
+    value_type = value_type.lower()
+    if any(word in value_type for word in IMAGE_WORDS):
+        return None
+    if "int" in value_type:
+        answer = {"type": "integer"}
+    elif "number" in value_type or "float" in value_type:
+        answer = {"type": "number"}
+    elif "bool" in value_type:
+        answer = {"type": "boolean"}
+    else:
+        answer = {"type": "string"}
+    return {
+        "type": "object",
+        "properties": {"answer": answer, "explanation": {"type": "string"}},
+        "required": ["answer"]
+    }
+
+def extract_answer(result: Dict[str, Any], value_type: str = "") -> Any:
+    """Pull the value for one question out of an agent result
+
+    Uses the fast-path answer, a chart for image keys, or the structured final
+    answer; when the model did not produce valid JSON the analysis text is returned
+    as is rather than guessing a value from it.
+    """
+    if result.get("answers"):
+        return result["answers"][0]["answer"]
+
+    if any(word in value_type.lower() for word in IMAGE_WORDS):
+        image = _find_image(result.get("tool_results", []))
+        if image is not None:
+            return image
+
+    analysis = result.get("analysis", "")
+    try:
+        structured = json.loads(analysis)
+    except (TypeError, ValueError):
+        return analysis
+    if isinstance(structured, dict) and "answer" in structured:
+        return structured["answer"]
+    return analysis
+
+def _find_image(tool_results: List[Dict[str, Any]]) -> Optional[str]:
+    """First base64 image string produced by a tool"""
+    def walk(value: Any) -> Optional[str]:
+        if isinstance(value, str):
+            if value.startswith("data:image") or value.startswith("iVBORw0KGgo"):
+                return value
+        elif isinstance(value, dict):
+            for item in value.values():
+                found = walk(item)
+                if found:
+                    return found
+        elif isinstance(value, list):
+            for item in value:
+                found = walk(item)
+                if found:
+                    return found
+        return None
+
+    for tool_result in tool_results:
+        found = walk(tool_result.get("result", {}).get("data"))
+        if found:
+            return found
+    return None
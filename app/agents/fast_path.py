@@ -0,0 +1,267 @@
+import logging
+import re
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from app.utils.compact import parse_dates
+
+logger = logging.getLogger(__name__)
+
+CHART_WORDS = re.compile(r'\b(plot|chart|graph|draw|visuali[sz]e|histogram|scatter|base64|png|image)\b')
+FILTER_WORDS = re.compile(r'\b(where|excluding|except|only|after|before|since|during|per|each|by|between|if|when|without|grouped)\b')
+
+AGGREGATE_KEYWORDS: List[Tuple[str, str]] = [
+    (r'\bmedian\b', "median"),
+    (r'\b(average|mean)\b', "mean"),
+    (r'\b(total|sum)\b', "sum"),
+    (r'\b(minimum|min|lowest|smallest)\b', "min"),
+    (r'\b(maximum|max|highest|largest|biggest)\b', "max"),
+    (r'\bstandard deviation\b', "std")
+]
+# Words each function may be asked with; any other word makes the question compound
+FUNCTION_WORDS = {
+    "median": {"median"},
+    "mean": {"average", "mean"},
+    "sum": {"total", "sum"},
+    "min": {"minimum", "min", "lowest", "smallest"},
+    "max": {"maximum", "max", "highest", "largest", "biggest"},
+    "std": {"standard", "deviation"},
+    "tax": {"total", "sum", "tax", "on"}
+}
+
+TOP_GROUP = re.compile(
+    r'\bwhich\s+(\w+(?:\s\w+)?)\s+(?:has|had|have|with|shows|generated|made)\s+(?:the\s+)?'
+    r'(highest|largest|greatest|most|biggest|top|lowest|smallest|least|fewest)\b(.*)'
+)
+# "Which month had ...", "What region has ...": the answer is a label, not a value
+LABEL_QUESTION = re.compile(r'\bwhich\b|^(?:what|who)\b.*\b(?:has|had|have)\b')
+# Filler that may surround "maximum <column>" in a plain min/max question
+PLAIN_WORDS = {"what", "what's", "whats", "is", "was", "are", "were", "the", "of", "value", "amount", "in", "data", "dataset", "column"}
+# "across all regions", "over all orders": the whole table, so not a filter
+WHOLE_TABLE = re.compile(r'\b(?:across|over|for|of|in)\s+all(?:\s+the)?\s+\w+')
+CORRELATION = re.compile(r'\bcorrelation\s+(?:coefficient\s+)?between\s+(?:the\s+)?(.+?)\s+and\s+(?:the\s+)?(.+?)(?:[?.(,]|$)')
+TAX_RATE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:%|percent\b)')
+# "if the tax rate is 10%", "at a 10% rate": how the rate is stated, not a filter
+TAX_RATE_CLAUSE = re.compile(
+    r'\b(?:(?:if|when|assuming|given)\s+(?:the\s+)?(?:tax\s+)?rate\s+is|at(?:\s+a)?(?:\s+rate\s+of)?|with\s+a\s+(?:tax\s+)?rate\s+of)?'
+    r'\s*\d+(?:\.\d+)?\s*(?:%|percent\b)(?:\s+(?:tax\s+)?rate\b)?'
+)
+
+class FastPathAnswer(BaseModel):
+    question: str
+    answer: Any
+    detail: str
+
+def _python_value(value: Any) -> Any:
+    """Convert NumPy/pandas scalars into plain JSON-friendly Python values"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+        return int(value)
+    return value
+
+class FastPathMatcher:
+    """Answers well-formed statistical questions directly from a DataFrame
+
+    Recognizes totals/medians/means/min/max of a column, the top group by an
+    aggregate ("which region has the highest total sales"), correlations between
+    columns or date parts, and tax at a percentage rate. Anything ambiguous —
+    charts, filters, grouped tables, unknown columns — returns None so the caller
+    falls back to the LLM.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.numeric_columns = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        self._date_columns: Optional[Dict[str, pd.Series]] = None
+        self._category_values: Optional[List[str]] = None
+
+    def match(self, question: str) -> Optional[FastPathAnswer]:
+        """Compute the answer for a question, or None when it isn't recognized"""
+        text = " ".join(question.lower().split())
+        if CHART_WORDS.search(text):
+            return None
+
+        matchers = [self._match_correlation, self._match_tax, self._match_top_group]
+        if not LABEL_QUESTION.search(text):
+            # A label question the top-group matcher could not resolve must not
+            # degrade into the plain max/min of a column
+            matchers.append(self._match_aggregate)
+        try:
+            for matcher in matchers:
+                result = matcher(text)
+                if result is not None:
+                    answer, detail = result
+                    return FastPathAnswer(question=question, answer=_python_value(answer), detail=detail)
+        except Exception as e:
+            logger.debug(f"Fast path failed for {question!r}: {e}")
+        return None
+
+    def _match_correlation(self, text: str) -> Optional[Tuple[Any, str]]:
+        match = CORRELATION.search(text)
+        if not match:
+            return None
+        left, left_name = self._resolve_series(match.group(1)) or (None, None)
+        right, right_name = self._resolve_series(match.group(2)) or (None, None)
+        if left is None or right is None:
+            return None
+        value = left.corr(right)
+        if pd.isna(value):
+            return None
+        return float(value), f"pearson({left_name}, {right_name})"
+
+    def _match_tax(self, text: str) -> Optional[Tuple[Any, str]]:
+        if "tax" not in text:
+            return None
+        rate = TAX_RATE.search(text)
+        columns = self._find_columns(text, self.numeric_columns)
+        if not rate or len(columns) != 1 or not re.search(r'\btotal\b', text):
+            return None
+        column = columns[0]
+        rest = TAX_RATE_CLAUSE.sub(" ", text, count=1)
+        if (
+            re.search(r'\d', rest) or FILTER_WORDS.search(rest) or self._mentions_category_value(rest)
+            or not self._is_plain_question(rest, column, FUNCTION_WORDS["tax"])
+        ):
+            return None
+        value = self.df[column].sum() * float(rate.group(1)) / 100
+        return float(value), f"sum({column}) * {rate.group(1)}%"
+
+    def _match_top_group(self, text: str) -> Optional[Tuple[Any, str]]:
+        match = TOP_GROUP.search(text)
+        if not match or re.search(r'\d', text) or self._mentions_category_value(text):
+            return None
+
+        group_columns = self._find_columns(match.group(1), [c for c in self.df.columns if c not in self.numeric_columns])
+        if len(group_columns) != 1:
+            return None
+        group = group_columns[0]
+
+        rest = match.group(3)
+        metric_columns = self._find_columns(rest, self.numeric_columns)
+        if len(metric_columns) > 1:
+            return None
+        if re.search(r'\b(average|mean)\b', rest):
+            function = "mean"
+        elif re.search(r'\bmedian\b', rest):
+            function = "median"
+        elif not metric_columns or re.search(r'\b(count|number of)\b', rest):
+            function = "count"
+        else:
+            function = "sum"
+
+        grouped = self.df.groupby(group, observed=True)
+        if function == "count":
+            values = grouped.size()
+            detail_column = "*"
+        else:
+            if not metric_columns:
+                return None
+            values = getattr(grouped[metric_columns[0]], function)()
+            detail_column = metric_columns[0]
+
+        lowest = match.group(2) in ("lowest", "smallest", "least", "fewest")
+        label = values.idxmin() if lowest else values.idxmax()
+        return label, f"{'argmin' if lowest else 'argmax'} {function}({detail_column}) by {group}"
+
+    def _match_aggregate(self, text: str) -> Optional[Tuple[Any, str]]:
+        if re.search(r'\d', text) or FILTER_WORDS.search(text) or self._mentions_category_value(text):
+            return None
+
+        count = re.search(r'\bhow many\s+(unique|distinct)?\s*(\w+)', text)
+        if count:
+            if count.group(1):
+                columns = self._find_columns(count.group(2), list(self.df.columns))
+                if len(columns) != 1:
+                    return None
+                return int(self.df[columns[0]].nunique()), f"nunique({columns[0]})"
+            if count.group(2) in ("rows", "records", "entries", "orders", "transactions", "observations"):
+                return len(self.df), "count(*)"
+            return None
+
+        functions = [function for pattern, function in AGGREGATE_KEYWORDS if re.search(pattern, text)]
+        columns = self._find_columns(text, self.numeric_columns)
+        if len(functions) != 1 or len(columns) != 1:
+            return None
+        function, column = functions[0], columns[0]
+        if not self._is_plain_question(text, column, FUNCTION_WORDS[function]):
+            return None
+        return getattr(self.df[column], function)(), f"{function}({column})"
+
+    def _is_plain_question(self, text: str, column: Any, function_words: set) -> bool:
+        """Whether text is only "what is the <function> <column>", with no other nouns
+
+        "Total number of sales", "average daily sales" or "median sales change" ask
+        for something else and must go to the LLM.
+        """
+        words = re.findall(r"[\w']+", WHOLE_TABLE.sub(" ", text))
+        leftover = [word for word in words if word not in PLAIN_WORDS | function_words]
+        return " ".join(leftover) in self._aliases(column)
+
+    def _resolve_series(self, phrase: str) -> Optional[Tuple[pd.Series, str]]:
+        """Map a phrase to a numeric column or a part of a date column"""
+        date_parts = [
+            (r'\bday of (?:the )?month\b', "day"),
+            (r'\bday of (?:the )?week\b', "dayofweek"),
+            (r'\bday of (?:the )?year\b', "dayofyear"),
+            (r'\bmonth\b', "month"),
+            (r'\byear\b', "year")
+        ]
+        columns = self._find_columns(phrase, self.numeric_columns)
+        if len(columns) == 1:
+            return self.df[columns[0]], columns[0]
+
+        for pattern, part in date_parts:
+            if re.search(pattern, phrase):
+                dates = self._date_series()
+                if len(dates) != 1:
+                    return None
+                name, series = next(iter(dates.items()))
+                return getattr(series.dt, part).astype(float), f"{name}.{part}"
+        return None
+
+    def _date_series(self) -> Dict[str, pd.Series]:
+        """Columns holding dates, parsed once"""
+        if self._date_columns is None:
+            self._date_columns = {}
+            for column in self.df.columns:
+                series = self.df[column]
+                if pd.api.types.is_datetime64_any_dtype(series):
+                    self._date_columns[column] = series
+                elif series.dtype == object or pd.api.types.is_string_dtype(series):
+                    parsed = parse_dates(series)
+                    if parsed is not None:
+                        self._date_columns[column] = parsed
+        return self._date_columns
+
+    def _mentions_category_value(self, text: str) -> bool:
+        """Whether the question names a specific categorical value (i.e. a filter)"""
+        if self._category_values is None:
+            values = set()
+            for column in self.df.columns:
+                if column in self.numeric_columns or column in self._date_series():
+                    continue
+                uniques = self.df[column].dropna().unique()
+                if len(uniques) <= 50:
+                    values.update(str(v).lower() for v in uniques if len(str(v)) > 1)
+            self._category_values = sorted(values)
+        return any(re.search(rf'\b{re.escape(value)}\b', text) for value in self._category_values)
+
+    def _find_columns(self, text: str, candidates: List[Any]) -> List[Any]:
+        """Columns from candidates mentioned in text, in order of appearance"""
+        found = []
+        for column in candidates:
+            aliases = self._aliases(column)
+            positions = [m.start() for alias in aliases for m in re.finditer(rf'\b{re.escape(alias)}\b', text)]
+            if positions:
+                found.append((min(positions), column))
+        return [column for _, column in sorted(found, key=lambda item: item[0])]
+
+    def _aliases(self, column: Any) -> set:
+        """Lower-case spellings of a column name, with and without a plural s"""
+        name = str(column).lower().strip()
+        aliases = {name, name.replace("_", " ")}
+        aliases.update({alias[:-1] for alias in list(aliases) if alias.endswith("s") and len(alias) > 3})
+        aliases.update({alias + "s" for alias in list(aliases)})
+        return aliases
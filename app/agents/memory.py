@@ -0,0 +1,78 @@
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterator, NamedTuple
+from app.core.config import settings
+
+# Metadata values with a longer repr are replaced by a short placeholder
+MAX_METADATA_VALUE_CHARS = 256
+
+class MemoryEntry(NamedTuple):
+    """Compact record of one message kept in agent memory"""
+    role: str
+    content: str
+    timestamp: float
+    metadata: Optional[Dict[str, Any]]
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token plus per-message overhead)"""
+    return len(text) // 4 + 4
+
+def _compact_metadata(metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Keep small metadata values and summarize large ones (tool results, file lists, ...)"""
+    if not metadata:
+        return None
+    compact = {}
+    for key, value in metadata.items():
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            compact[key] = value if not isinstance(value, str) or len(value) <= MAX_METADATA_VALUE_CHARS else value[:MAX_METADATA_VALUE_CHARS] + "..."
+        elif len(repr(value)) <= MAX_METADATA_VALUE_CHARS:
+            compact[key] = value
+        else:
+            size = len(value) if hasattr(value, "__len__") else 1
+            compact[key] = f"<{type(value).__name__} with {size} items omitted>"
+    return compact
+
+class AgentMemory:
+    """Ring buffer of agent messages bounded by Settings.max_memory_entries
+
+    Entries are stored as small tuples with compacted metadata, and prompt context is
+    built newest-first until an approximate token budget is filled.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self._entries: deque = deque(maxlen=max_entries or settings.max_memory_entries)
+
+    def add(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        """Append a message, evicting the oldest once the buffer is full"""
+        self._entries.append(MemoryEntry(role, content, time.time(), _compact_metadata(metadata)))
+
+    def build_context(self, token_budget: int, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Most recent messages that fit in token_budget, oldest first
+
+        The newest message is always included, even if it alone exceeds the budget.
+        """
+        selected = []
+        used = 0
+        for entry in reversed(self._entries):
+            if limit is not None and len(selected) >= limit:
+                break
+            tokens = estimate_tokens(entry.content)
+            if selected and used + tokens > token_budget:
+                break
+            selected.append({"role": entry.role, "content": entry.content})
+            used += tokens
+        selected.reverse()
+        return selected
+
+    def clear(self):
+        """Forget all messages"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[MemoryEntry]:
+        return iter(self._entries)
+
+    def __getitem__(self, index: int) -> MemoryEntry:
+        return self._entries[index]
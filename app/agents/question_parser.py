@@ -0,0 +1,49 @@
+import re
+from typing import List, Tuple
+
+NUMBERED_LINE = re.compile(r'^\s*(\d+)[.)]\s+(.*\S)\s*$')
+
+def split_questions(text: str) -> List[str]:
+    """Split a numbered question list ("1. ...", "2) ...") into individual questions
+
+    Unnumbered lines directly after a numbered line are treated as its continuation.
+    Returns an empty list when the text has no numbered questions.
+    """
+    questions: List[str] = []
+    continuing = False
+
+    for line in text.splitlines():
+        match = NUMBERED_LINE.match(line)
+        if match:
+            questions.append(match.group(2))
+            continuing = True
+        elif continuing and line.strip() and not line.lstrip().startswith(('-', '*', '#')):
+            questions[-1] = f"{questions[-1]} {line.strip()}"
+        else:
+            continuing = False
+
+    return questions
+
+RESPONSE_KEY_LINE = re.compile(r'^\s*[-*]\s*`([^`]+)`\s*:\s*(.+?)\s*$')
+
+def parse_response_keys(text: str) -> List[Tuple[str, str]]:
+    """Extract the requested JSON keys and their types from lines like "- `total_sales`: number" """
+    keys = []
+    for line in text.splitlines():
+        match = RESPONSE_KEY_LINE.match(line)
+        if match:
+            keys.append((match.group(1), match.group(2)))
+    return keys
+
+def question_preamble(text: str) -> str:
+    """Instructions that precede the key list and numbered questions (e.g. "Analyze `sales.csv`.")"""
+    preamble = []
+    for line in text.splitlines():
+        if NUMBERED_LINE.match(line) or RESPONSE_KEY_LINE.match(line):
+            break
+        preamble.append(line)
+    
+    # Drop a dangling lead-in such as "Return a JSON object with keys:"
+    while preamble and (not preamble[-1].strip() or preamble[-1].rstrip().endswith(":")):
+        preamble.pop()
+    return "\n".join(preamble).strip()
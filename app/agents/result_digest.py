@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Any, List
+from app.core.config import settings
+
+BASE64_BLOB = re.compile(r'^[A-Za-z0-9+/=\s]{512,}$')
+MAX_STRING_CHARS = 200
+MAX_DICT_KEYS = 20
+
+def _is_image(value: str) -> bool:
+    return value.startswith("data:image") or value.startswith("iVBORw0KGgo") or bool(BASE64_BLOB.match(value[:4096]))
+
+def _digest_value(value: Any, path: str, top_k: int) -> Any:
+    """Size-bounded summary of a tool output value"""
+    if isinstance(value, str):
+        if len(value) > MAX_STRING_CHARS and _is_image(value):
+            digest = hashlib.sha256(value.encode()).hexdigest()[:12]
+            return f"<image omitted: {path}, {len(value) // 1024} kB, sha256:{digest}>"
+        if len(value) > MAX_STRING_CHARS:
+            return f"{value[:MAX_STRING_CHARS]}... ({len(value)} chars)"
+        return value
+
+    if isinstance(value, float):
+        return round(value, 6)
+
+    if isinstance(value, dict):
+        items = list(value.items())
+        digest = {
+            str(key): _digest_value(item, f"{path}.{key}", top_k)
+            for key, item in items[:MAX_DICT_KEYS]
+        }
+        if len(items) > MAX_DICT_KEYS:
+            digest["..."] = f"{len(items) - MAX_DICT_KEYS} more keys"
+        return digest
+
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            # Tabular records: schema plus the first rows
+            return {
+                "row_count": len(value),
+                "columns": list(value[0].keys())[:MAX_DICT_KEYS],
+                "head": [_digest_value(item, f"{path}[{i}]", top_k) for i, item in enumerate(value[:top_k])]
+            }
+        head = [_digest_value(item, f"{path}[{i}]", top_k) for i, item in enumerate(value[:top_k])]
+        if len(value) > top_k:
+            head.append(f"... ({len(value)} items)")
+        return head
+
+    return value
+
+def _digest_parameters(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    compact = {}
+    for key, value in parameters.items():
+        if key == "file_path" and isinstance(value, str):
+            value = os.path.basename(value)
+        compact[key] = _digest_value(value, key, 3)
+    return compact
+
+def _digest_result(index: int, tool_result: Dict[str, Any], top_k: int) -> str:
+    result = tool_result.get("result", {})
+    entry = {
+        "tool": tool_result.get("tool"),
+        "parameters": _digest_parameters(tool_result.get("parameters", {})),
+        "success": result.get("success")
+    }
+    if result.get("error"):
+        entry["error"] = _digest_value(result["error"], "error", top_k)
+    if result.get("data") is not None:
+        entry["data"] = _digest_value(result["data"], f"tool_results[{index}].result.data", top_k)
+    if result.get("metadata"):
+        entry["metadata"] = _digest_value(result["metadata"], f"tool_results[{index}].result.metadata", top_k)
+    return json.dumps(entry, default=str, separators=(",", ":"))
+
+def digest_tool_results(tool_results: List[Dict[str, Any]], max_chars: int = None) -> str:
+    """Compact, size-capped text summary of tool results for an LLM prompt
+
+    Data payloads are reduced to schemas, the first rows and truncated strings, and
+    images are replaced with a handle naming where the full value lives in the tool
+    results. Fewer rows are shown until the digest fits max_chars; each result is then
+    cut to an equal share of the budget.
+    """
+    max_chars = max_chars or settings.summary_max_chars
+    if not tool_results:
+        return "No tools were run."
+
+    for top_k in sorted({settings.summary_top_k_rows, 2, 0}, reverse=True):
+        lines = [_digest_result(i, tool_result, top_k) for i, tool_result in enumerate(tool_results)]
+        digest = "\n".join(lines)
+        if len(digest) <= max_chars:
+            return digest
+
+    share = max(max_chars // len(lines) - 1, 20)
+    return "\n".join(line if len(line) <= share else line[:share - 3] + "..." for line in lines)
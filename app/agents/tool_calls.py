@@ -0,0 +1,232 @@
+import ast
+import json
+import logging
+import re
+from typing import Dict, Any, Callable, List, Optional
+from pydantic import BaseModel, ValidationError
+from app.tools.base_tool import ToolMetadata
+
+logger = logging.getLogger(__name__)
+
+JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict
+}
+
+TEXT_CALL_START = re.compile(r'@(\w+)\($')
+
+# Parameters the agent fills in itself when the model leaves them out
+AUTO_PARAMETERS = {"file_path"}
+
+JSON_TOOL_CALL_INSTRUCTIONS = """Respond with a single JSON object of the form
+{"reasoning": "<how you will answer>", "tool_calls": [{"tool": "<tool name>", "parameters": {...}}]}
+Use an empty tool_calls list when no tool is needed."""
+
+class ToolCall(BaseModel):
+    tool: str
+    parameters: Dict[str, Any] = {}
+
+class ToolCallPlan(BaseModel):
+    reasoning: str = ""
+    tool_calls: List[ToolCall] = []
+
+def tool_call_schema(tools: List[ToolMetadata]) -> Dict[str, Any]:
+    """JSON schema for a ToolCallPlan restricted to the given tools, for Ollama's `format`"""
+    variants = [
+        {
+            "type": "object",
+            "properties": {
+                "tool": {"type": "string", "enum": [metadata.name]},
+                "parameters": {
+                    "type": "object",
+                    "properties": metadata.parameters,
+                    "required": [name for name in metadata.required if name not in AUTO_PARAMETERS]
+                }
+            },
+            "required": ["tool", "parameters"]
+        }
+        for metadata in tools
+    ]
+    item = variants[0] if len(variants) == 1 else {"anyOf": variants}
+    return {
+        "type": "object",
+        "properties": {
+            "reasoning": {"type": "string"},
+            "tool_calls": {"type": "array", "items": item} if variants else {"type": "array", "maxItems": 0}
+        },
+        "required": ["reasoning", "tool_calls"]
+    }
+
+def _type_matches(value: Any, spec: Any) -> bool:
+    expected = JSON_TYPES.get(spec.get("type")) if isinstance(spec, dict) else None
+    if expected is None:
+        return True
+    if isinstance(value, bool) and spec["type"] in ("integer", "number"):
+        return False
+    return isinstance(value, expected)
+
+def validate_tool_call(call: ToolCall, metadata: Optional[ToolMetadata]) -> Optional[str]:
+    """Reason the call does not match its tool's metadata, or None when it does"""
+    if metadata is None:
+        return f"unknown tool '{call.tool}'"
+    missing = [
+        name for name in metadata.required
+        if name not in call.parameters and name not in AUTO_PARAMETERS
+    ]
+    if missing:
+        return f"{call.tool}: missing required parameters {missing}"
+    for name, value in call.parameters.items():
+        spec = metadata.parameters.get(name)
+        if spec is not None and not _type_matches(value, spec):
+            return f"{call.tool}: parameter '{name}' should be of type {spec.get('type')}"
+    return None
+
+def parse_json_tool_calls(
+    content: str,
+    get_metadata: Callable[[str], Optional[ToolMetadata]]
+) -> Optional[List[Dict[str, Any]]]:
+    """Strictly parse a ToolCallPlan response into tool calls
+
+    Returns None when the content is not a valid plan, so the caller can fall back to
+    another parser. Individual calls that don't match their tool's metadata are dropped.
+    """
+    try:
+        plan = ToolCallPlan(**json.loads(content))
+    except (ValueError, TypeError, ValidationError) as e:
+        logger.debug(f"Response is not a JSON tool-call plan: {e}")
+        return None
+
+    tool_calls = []
+    for call in plan.tool_calls:
+        error = validate_tool_call(call, get_metadata(call.tool))
+        if error:
+            logger.warning(f"Dropping invalid tool call: {error}")
+            continue
+        tool_calls.append({"tool": call.tool, "parameters": call.parameters})
+    return tool_calls
+
+class IncrementalToolCallParser:
+    """Recognizes tool calls in a streamed completion as soon as each one is complete
+
+    In JSON mode every object in the plan's top-level array is a candidate call, closed
+    by its matching brace; in text mode a call is `@name(` up to its balanced closing
+    parenthesis. String literals are tracked so delimiters inside them are ignored.
+    """
+
+    def __init__(
+        self,
+        structured: bool = False,
+        get_metadata: Optional[Callable[[str], Optional[ToolMetadata]]] = None
+    ):
+        self.structured = structured
+        self.get_metadata = get_metadata
+        self._buffer = ""
+        self._position = 0
+        self._stack: List[str] = []
+        self._quote: Optional[str] = None
+        self._escaped = False
+        self._start: Optional[int] = None
+        self._name: Optional[str] = None
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume more streamed text and return the calls it completed"""
+        self._buffer += text
+        calls = []
+        while self._position < len(self._buffer):
+            char = self._buffer[self._position]
+            call = self._scan_json(char) if self.structured else self._scan_text(char)
+            self._position += 1
+            if call is not None:
+                calls.append(call)
+        if not self.structured and self._name is None and len(self._buffer) > 256:
+            # Outside a call only the tail can still hold the start of one
+            self._buffer = self._buffer[-128:]
+            self._position = len(self._buffer)
+        return calls
+
+    def _in_string(self, char: str) -> bool:
+        """Advance string-literal state; True while inside (or closing) a literal"""
+        if self._quote is not None:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == self._quote:
+                self._quote = None
+            return True
+        return False
+
+    def _scan_json(self, char: str) -> Optional[Dict[str, Any]]:
+        if self._in_string(char):
+            return None
+        if char == '"':
+            self._quote = char
+        elif char in "{[":
+            if char == "{" and self._stack == ["{", "["]:
+                self._start = self._position
+            self._stack.append(char)
+        elif char in "}]" and self._stack:
+            self._stack.pop()
+            if char == "}" and self._start is not None and self._stack == ["{", "["]:
+                snippet = self._buffer[self._start:self._position + 1]
+                self._start = None
+                return self._json_call(snippet)
+        return None
+
+    def _json_call(self, snippet: str) -> Optional[Dict[str, Any]]:
+        try:
+            call = ToolCall(**json.loads(snippet))
+        except (ValueError, TypeError, ValidationError):
+            return None
+        if self.get_metadata is not None:
+            error = validate_tool_call(call, self.get_metadata(call.tool))
+            if error:
+                logger.warning(f"Dropping invalid tool call: {error}")
+                return None
+        return {"tool": call.tool, "parameters": call.parameters}
+
+    def _scan_text(self, char: str) -> Optional[Dict[str, Any]]:
+        if self._name is None:
+            if char == "(":
+                match = TEXT_CALL_START.search(self._buffer, 0, self._position + 1)
+                if match is not None:
+                    self._name = match.group(1)
+                    self._start = self._position + 1
+                    self._stack = ["("]
+            return None
+
+        if self._in_string(char):
+            return None
+        if char in "\"'":
+            self._quote = char
+        elif char in "([{":
+            self._stack.append(char)
+        elif char in ")]}":
+            self._stack.pop()
+            if not self._stack:
+                name, arguments = self._name, self._buffer[self._start:self._position]
+                self._name = self._start = None
+                # Completed calls are no longer needed; keep the buffer small
+                self._buffer = self._buffer[self._position + 1:]
+                self._position = -1
+                return self._text_call(name, arguments)
+        return None
+
+    def _text_call(self, name: str, arguments: str) -> Optional[Dict[str, Any]]:
+        parameters: Any = {}
+        if arguments.strip():
+            try:
+                parameters = json.loads(arguments)
+            except ValueError:
+                try:
+                    parameters = ast.literal_eval(arguments)
+                except (ValueError, SyntaxError):
+                    logger.warning(f"Could not parse arguments of @{name}: {arguments[:100]}")
+                    return None
+        if not isinstance(parameters, dict):
+            return None
+        return {"tool": name, "parameters": parameters}
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, AsyncGenerator
+from app.core.config import settings
+from app.tools.base_tool import BaseTool, ToolResult
+
+logger = logging.getLogger(__name__)
+
+class ToolScheduler:
+    """Runs independent tool calls concurrently under a bounded semaphore"""
+
+    def __init__(self, max_concurrent: int = None, timeout: float = None):
+        self.max_concurrent = max_concurrent or settings.max_concurrent_tools
+        self.timeout = timeout or settings.tool_timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._results: List[Optional[Dict[str, Any]]] = []
+        self._pending = 0
+
+    def submit(self, tool: BaseTool, tool_name: str, parameters: Dict[str, Any]) -> int:
+        """Schedule a tool call and return its position in the result list"""
+        index = len(self._results)
+        self._results.append(None)
+        self._pending += 1
+        self._tasks.append(asyncio.create_task(
+            self._run(index, tool, tool_name, parameters)
+        ))
+        return index
+
+    async def _run(self, index: int, tool: BaseTool, tool_name: str, parameters: Dict[str, Any]):
+        """Execute one tool call, converting timeouts and errors into failed results"""
+        try:
+            async with self._semaphore:
+                self._events.put_nowait({"type": "tool_started", "index": index, "tool": tool_name})
+                try:
+                    result = await asyncio.wait_for(tool.invoke(parameters), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Tool {tool_name} timed out after {self.timeout}s")
+                    result = ToolResult(
+                        success=False,
+                        error=f"Tool '{tool_name}' timed out after {self.timeout}s"
+                    )
+                except Exception as e:
+                    logger.error(f"Tool {tool_name} failed: {e}")
+                    result = ToolResult(success=False, error=str(e))
+
+            self._results[index] = {
+                "tool": tool_name,
+                "parameters": parameters,
+                "result": result.dict()
+            }
+            self._events.put_nowait({
+                "type": "tool_finished",
+                "index": index,
+                "tool": tool_name,
+                "success": result.success,
+                "result": self._results[index]["result"]
+            })
+        finally:
+            self._pending -= 1
+            self._events.put_nowait(None)
+
+    async def events(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield progress events until every submitted call has finished"""
+        while self._pending > 0 or not self._events.empty():
+            event = await self._events.get()
+            if event is not None:
+                yield event
+
+    def pending_events(self) -> List[Dict[str, Any]]:
+        """Progress events already queued, without waiting for more"""
+        events = []
+        while not self._events.empty():
+            event = self._events.get_nowait()
+            if event is not None:
+                events.append(event)
+        return events
+    
+    def results(self) -> List[Dict[str, Any]]:
+        """Completed results in submission order"""
+        return [result for result in self._results if result is not None]
+
+    async def cancel(self):
+        """Cancel any calls still running"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,205 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import math
+from app.api.new_endpoints import run_analysis
+from app.core.config import settings
+from app.llm.admission import request_deadline
+from app.utils.file_handler import FileHandler, UploadTooLargeError
+from app.utils.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs")
+
+FINISHED = ("succeeded", "failed")
+POLL_INTERVAL = 0.5
+
+class JobRunner:
+    """Runs submitted analyses on a bounded pool of background workers
+
+    At most `max_queued` jobs wait for one of the `workers`; further submissions are
+    refused. Results go to the JobStore, so any API process sharing the store can
+    serve them. The runner keeps the leases of its own jobs alive, and fails only
+    jobs whose owner stopped renewing them.
+    """
+
+    def __init__(self, store: JobStore = None, workers: int = None, max_queued: int = None, timeout: float = None):
+        self.store = store or JobStore()
+        self.workers = workers or settings.job_workers
+        self.max_queued = max_queued or settings.job_queue_size
+        self.timeout = timeout or settings.job_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._finished: Dict[str, asyncio.Event] = {}
+
+    async def start(self):
+        """Start the workers and the expiry sweeper"""
+        if self._tasks:
+            return
+        interrupted = await asyncio.to_thread(
+            self.store.fail_abandoned, "Interrupted by a server restart", include_own=True
+        )
+        if interrupted:
+            logger.warning(f"Marked {interrupted} abandoned jobs as failed")
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Queued jobs never started; release their uploads
+        while self._queue is not None and not self._queue.empty():
+            job_id, file_handler, _, _ = self._queue.get_nowait()
+            file_handler.cleanup()
+            await asyncio.to_thread(self.store.set_status, job_id, "failed", "Server shut down before the job started")
+        self.store.close()
+
+    async def submit(self, file_handler: FileHandler, questions_content: str, processed_files: Dict[str, Any]) -> str:
+        """Queue an analysis and return its job id; raises asyncio.QueueFull when saturated"""
+        await self.start()
+        if self._queue.full():
+            raise asyncio.QueueFull()
+        job_id = await asyncio.to_thread(self.store.create)
+        self._finished[job_id] = asyncio.Event()
+        self._queue.put_nowait((job_id, file_handler, questions_content, processed_files))
+        return job_id
+
+    def retry_after(self) -> int:
+        """Rough seconds until a queue slot frees up"""
+        return max(1, math.ceil(self.timeout / self.workers))
+
+    async def _worker(self):
+        while True:
+            job_id, file_handler, questions_content, processed_files = await self._queue.get()
+            try:
+                await self._run(job_id, questions_content, processed_files)
+            finally:
+                file_handler.cleanup()
+                event = self._finished.pop(job_id, None)
+                if event is not None:
+                    event.set()
+
+    async def _run(self, job_id: str, questions_content: str, processed_files: Dict[str, Any]):
+        await asyncio.to_thread(self.store.set_status, job_id, "running")
+        try:
+            with request_deadline(self.timeout):
+                result = await asyncio.wait_for(
+                    run_analysis(questions_content, processed_files),
+                    timeout=self.timeout
+                )
+            await asyncio.to_thread(self.store.save_result, job_id, result)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.store.set_status, job_id, "failed", "Server shut down while the job was running")
+            raise
+        except asyncio.TimeoutError:
+            await asyncio.to_thread(self.store.set_status, job_id, "failed", "Task timed out")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await asyncio.to_thread(self.store.set_status, job_id, "failed", str(e))
+
+    async def _sweep(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.store.evict_expired)
+                abandoned = await asyncio.to_thread(self.store.fail_abandoned, "Worker stopped responding")
+                if abandoned:
+                    logger.warning(f"Marked {abandoned} jobs of unresponsive workers as failed")
+            except Exception as e:
+                logger.warning(f"Job store eviction failed: {e}")
+            await asyncio.sleep(settings.job_sweep_interval)
+
+    async def _heartbeat(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.store.renew_leases)
+            except Exception as e:
+                logger.warning(f"Renewing job leases failed: {e}")
+            await asyncio.sleep(settings.job_heartbeat_interval)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Job status, waiting up to timeout seconds for it to finish"""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] in FINISHED or timeout <= 0:
+            return job
+
+        event = self._finished.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            return await asyncio.to_thread(self.store.get, job_id)
+
+        # Running in another process: poll the shared store
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while job is not None and job["status"] not in FINISHED and loop.time() < deadline:
+            await asyncio.sleep(min(POLL_INTERVAL, max(deadline - loop.time(), 0)))
+            job = await asyncio.to_thread(self.store.get, job_id)
+        return job
+
+# Global job runner instance
+job_runner = JobRunner()
+
+@router.post("", status_code=202)
+async def submit_job(files: List[UploadFile] = File(...)):
+    """
+    Submit an analysis as a background job.
+    Accepts the same multipart upload as `POST /` and returns a job id immediately;
+    poll `GET /jobs/{job_id}` for the result.
+    """
+    file_handler = FileHandler()
+    try:
+        processed_files = await file_handler.process_uploads(files)
+    except UploadTooLargeError as e:
+        file_handler.cleanup()
+        raise HTTPException(status_code=413, detail=str(e))
+
+    questions_content = processed_files.get('questions.txt', '')
+    if not questions_content:
+        file_handler.cleanup()
+        raise HTTPException(status_code=400, detail="questions.txt file is required")
+
+    try:
+        job_id = await job_runner.submit(file_handler, questions_content, processed_files)
+    except asyncio.QueueFull:
+        file_handler.cleanup()
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Job queue is full"},
+            headers={"Retry-After": str(job_runner.retry_after())}
+        )
+
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish (long poll)"),
+    inline_artifacts: bool = Query(True, description="Inline chart images as base64 instead of artifact references")
+):
+    """Job status, with the result once it has succeeded"""
+    job = await job_runner.wait(job_id, min(wait, settings.job_max_wait))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+    if job["status"] == "succeeded":
+        job["result"] = await asyncio.to_thread(job_runner.store.load_result, job_id, inline_artifacts)
+    return job
+
+@router.get("/{job_id}/artifacts/{name}")
+async def get_job_artifact(job_id: str, name: str):
+    """A chart image produced by a job"""
+    if await asyncio.to_thread(job_runner.store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    path = job_runner.store.artifact_path(job_id, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path)
@@ -1,17 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, Any, List, Optional, AsyncGenerator
 import asyncio
 import logging
 import json
+import math
 from datetime import datetime
 from app.agents.data_analyst_agent import DataAnalystAgent
-from app.utils.file_handler import FileHandler
+from app.agents.fanout import answer_questions
+from app.core.config import settings
+from app.llm.admission import AdmissionRejected, request_deadline
+from app.utils.file_handler import FileHandler, UploadTooLargeError
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+ANALYSIS_TIMEOUT = 180  # 3 minutes
+
 @router.post("/")
 async def analyze_data(
     files: List[UploadFile] = File(...),
@@ -22,11 +28,10 @@ async def analyze_data(
     Accepts multipart/form-data with questions.txt and optional data files.
     Returns JSON object response as required by promptfoo evaluation.
     """
+    # Initialize services
+    file_handler = FileHandler()
+    
     try:
-        # Initialize services
-        file_handler = FileHandler()
-        agent = DataAnalystAgent()
-        
         # Process uploaded files
         processed_files = await file_handler.process_uploads(files)
         
@@ -38,43 +43,143 @@ async def analyze_data(
                 detail="questions.txt file is required"
             )
         
-        # Parse the request
-        request_data = {
-            "request": questions_content,
-            "files": processed_files
-        }
-        
         # Execute analysis with 3-minute timeout
         try:
-            result = await asyncio.wait_for(
-                agent.process(request_data),
-                timeout=180  # 3 minutes
-            )
-            
-            # Ensure we return a proper JSON object for promptfoo
-            if isinstance(result, dict):
-                return result
-            elif isinstance(result, str):
-                try:
-                    # Try to parse string as JSON
-                    parsed = json.loads(result)
-                    if isinstance(parsed, dict):
-                        return parsed
-                    else:
-                        return {"result": str(result)}
-                except:
-                    return {"result": str(result)}
-            else:
-                return {"result": str(result)}
-            
+            with request_deadline(ANALYSIS_TIMEOUT):
+                return await asyncio.wait_for(
+                    run_analysis(questions_content, processed_files),
+                    timeout=ANALYSIS_TIMEOUT
+                )
         except asyncio.TimeoutError:
             return {"error": "Task timed out"}
+    
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=503,
+            content={"error": str(e)},
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
             
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
         return {"error": str(e)}
+    
+    finally:
+        file_handler.cleanup()
 
-@router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "version": "2.0.0"}
+async def run_analysis(questions_content: str, processed_files: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the analysis for a questions.txt and normalize the result to a JSON object"""
+    # Numbered questions fan out into parallel sub-tasks with their own time budgets
+    result = await answer_questions(
+        questions_content,
+        processed_files,
+        question_timeout=min(settings.question_timeout, ANALYSIS_TIMEOUT - 5)
+    )
+    if result is not None:
+        return result
+    
+    agent = DataAnalystAgent()
+    result = await agent.process({
+        "request": questions_content,
+        "files": processed_files
+    })
+    
+    # Ensure we return a proper JSON object for promptfoo
+    if isinstance(result, dict):
+        return result
+    elif isinstance(result, str):
+        try:
+            # Try to parse string as JSON
+            parsed = json.loads(result)
+            if isinstance(parsed, dict):
+                return parsed
+            else:
+                return {"result": str(result)}
+        except:
+            return {"result": str(result)}
+    else:
+        return {"result": str(result)}
+
+@router.post("/stream")
+async def analyze_data_stream(
+    request: Request,
+    files: List[UploadFile] = File(...)
+):
+    """
+    Streaming variant of the analysis endpoint.
+    Emits progress events (status, tokens, tool started/finished, result) as
+    newline-delimited JSON, or as Server-Sent Events when the client sends
+    `Accept: text/event-stream`.
+    """
+    file_handler = FileHandler()
+    agent = DataAnalystAgent()
+    
+    # Uploads must be consumed before the response starts streaming
+    try:
+        processed_files = await file_handler.process_uploads(files)
+    except UploadTooLargeError as e:
+        file_handler.cleanup()
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    questions_content = processed_files.get('questions.txt', '')
+    if not questions_content:
+        file_handler.cleanup()
+        raise HTTPException(
+            status_code=400,
+            detail="questions.txt file is required"
+        )
+    
+    request_data = {
+        "request": questions_content,
+        "files": processed_files
+    }
+    
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+    
+    async def event_stream() -> AsyncGenerator[str, None]:
+        try:
+            with request_deadline(ANALYSIS_TIMEOUT):
+                async for event in _events_with_deadline(agent.process_stream(request_data), ANALYSIS_TIMEOUT):
+                    payload = json.dumps(event, default=str)
+                    if use_sse:
+                        yield f"event: {event['type']}\ndata: {payload}\n\n"
+                    else:
+                        yield payload + "\n"
+        finally:
+            file_handler.cleanup()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _events_with_deadline(
+    events: AsyncGenerator[Dict[str, Any], None],
+    timeout: float
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Relay agent events until the overall deadline, then emit an error event"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            try:
+                event = await asyncio.wait_for(events.__anext__(), timeout=remaining)
+            except StopAsyncIteration:
+                break
+            yield event
+    except asyncio.TimeoutError:
+        yield {"type": "error", "error": "Task timed out"}
+    except AdmissionRejected as e:
+        yield {"type": "error", "error": str(e), "retry_after": math.ceil(e.retry_after)}
+    except Exception as e:
+        logger.error(f"Streaming analysis error: {str(e)}")
+        yield {"type": "error", "error": str(e)}
+    finally:
+        await events.aclose()
@@ -14,19 +14,120 @@ class Settings(BaseSettings):
     ollama_port: int = 11434
     ollama_model: str = "llama3.2"
     
+    # Ollama HTTP Pool Settings
+    ollama_max_connections: int = 20
+    ollama_max_keepalive_connections: int = 10
+    ollama_keepalive_expiry: float = 30.0
+    ollama_connect_timeout: float = 10.0
+    ollama_http2: bool = False
+    
+    # Ollama Backend Pool Settings
+    ollama_backends: str = ""  # comma-separated base URLs; empty uses ollama_host:ollama_port
+    ollama_backend_max_concurrent: int = 4  # per backend; 0 for no cap
+    ollama_health_interval: float = 15.0
+    ollama_failure_cooldown: float = 30.0
+    ollama_hedge_enabled: bool = False
+    ollama_hedge_percentile: float = 95.0
+    ollama_hedge_min_samples: int = 20
+    
+    # LLM Admission Control Settings
+    llm_max_in_flight: int = 8  # concurrent LLM calls across all requests; 0 disables admission control
+    llm_queue_size: int = 64
+    llm_service_time_estimate: float = 20.0  # seconds per call until real durations are measured
+    
     # Agent Settings
     max_iterations: int = 10
     timeout_seconds: int = 300
+    fast_path_enabled: bool = True
+    question_timeout: int = 150  # per-question budget when questions.txt fans out
+    summary_max_chars: int = 6000  # cap on the tool-result digest in the summary prompt
+    summary_top_k_rows: int = 5
     
     # Memory Settings
     memory_enabled: bool = True
     max_memory_entries: int = 1000
+    context_token_budget: int = 4096  # approximate tokens of system prompt + history per LLM call
     
     # Tool Settings
     tool_timeout: int = 60
     max_concurrent_tools: int = 5
+    tool_executor: str = "thread"  # "thread" or "process" pool for CPU-bound tools
+    tool_executor_workers: int = 4
+    tool_cache_enabled: bool = True
+    tool_manifest_path: str = "./data/tool_manifest.json"
+    tool_cache_max_entries: int = 256
+    prompt_tool_top_k: int = 4  # tools whose schemas are put in each planning prompt
+    tool_call_format: str = "json"  # "json" (schema-constrained output) or "text" (@tool(...) calls)
+    
+    # Chart Rendering Settings
+    chart_workers: int = 2
+    chart_executor: str = "process"  # "process" or "thread" pool of pre-warmed matplotlib workers
+    chart_cache_max_entries: int = 128
+    chart_max_bytes: int = 100_000  # default size limit of a chart's base64 data URI
+    
+    # Upload Settings
+    upload_spool_dir: Optional[str] = None  # defaults to the system temp dir
+    max_upload_bytes: int = 1024 * 1024 * 1024
+    max_request_upload_bytes: int = 2 * 1024 * 1024 * 1024
+    
+    # Data Loading Settings
+    compact_dtypes: bool = True  # int64 to int32, parse dates and use categoricals when loading
+    compact_category_max_ratio: float = 0.5  # text with at most this share of distinct values becomes categorical
+    compact_downcast_floats: bool = False  # float32 keeps only ~7 significant digits
+    compact_arrow_dtypes: bool = False  # Arrow-backed dtypes for the remaining columns
+    
+    # Dataset Profile Settings (column summary built at upload and put in the first prompt)
+    dataset_profile_enabled: bool = True
+    dataset_profile_dir: str = "./data/profiles"
+    dataset_profile_sample_rows: int = 3
+    dataset_profile_timeout: float = 10.0  # longest the planner waits for an unfinished profile
+    
+    # Dataset Cache Settings
+    dataset_cache_max_bytes: int = 512 * 1024 * 1024
+    dataset_cache_dir: str = "./data/dataset_cache"
+    dataset_cache_disk_max_bytes: int = 4 * 1024 * 1024 * 1024  # least recently used spill files are deleted beyond this
+    dataset_cache_spill: bool = True
+    
+    # Chunked Analysis Settings (CSVs analyzed in a streaming pass instead of loaded whole)
+    chunked_analysis_threshold_bytes: int = 256 * 1024 * 1024
+    chunked_analysis_chunk_rows: int = 100_000
+    chunked_analysis_workers: int = 1  # >1 splits a file across that many processes
+    tdigest_compression: int = 200
+    hll_precision: int = 14  # 2**14 registers, ~0.8% standard error on distinct counts
+    
+    # Approximate Analysis Settings (sampled answers when a full scan would miss the deadline)
+    approximate_sample_rows: int = 100_000
+    approximate_confidence: float = 0.95
+    approximate_latency_budget: float = 30.0  # seconds a scan may take when the request has no deadline
+    approximate_budget_share: float = 0.5  # share of the remaining deadline a full scan may use
+    scan_bytes_per_second: float = 50 * 1024 * 1024  # starting estimate, refined by measured scans
+    
+    # Query Engine Settings
+    duckdb_threads: int = 0  # 0 lets DuckDB use every core
+    duckdb_memory_limit: Optional[str] = None  # e.g. "4GB"; larger aggregations spill to disk
+    duckdb_temp_dir: Optional[str] = None
+    query_max_rows: int = 100
+    
+    # Job Settings (POST /jobs)
+    job_store_dir: str = "./data/jobs"
+    job_workers: int = 2
+    job_queue_size: int = 100
+    job_timeout: int = 600
+    job_ttl_seconds: int = 24 * 60 * 60
+    job_sweep_interval: float = 300.0
+    job_max_wait: float = 60.0  # longest long-poll on GET /jobs/{id}
+    job_worker_id: Optional[str] = None  # stable id so a restarted worker fails its own leftover jobs; default host-pid
+    job_lease_seconds: float = 60.0  # unfinished jobs not renewed for this long are failed
+    job_heartbeat_interval: float = 15.0
     
     # Vector Store Settings
     vector_store_path: str = "./data/vector_store"
+    
+    # LLM Response Cache Settings (persisted under vector_store_path)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 24 * 60 * 60
+    llm_cache_max_entries: int = 10000
+    llm_cache_semantic: bool = False
+    llm_cache_similarity_threshold: float = 0.95
 
 settings = Settings()
@@ -0,0 +1,187 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Monotonic time by which the current request must be answered, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+class AdmissionRejected(Exception):
+    """An LLM call was shed because it could not finish within its deadline"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[None]:
+    """Give the LLM calls made inside this block a deadline (never later than an outer one)"""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None when it has none"""
+    deadline = _deadline.get()
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+class _Waiter:
+    __slots__ = ("key", "future", "enqueued")
+
+    def __init__(self, key: tuple, future: asyncio.Future):
+        self.key = key
+        self.future = future
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+class AdmissionController:
+    """Caps concurrent LLM calls, queueing the excess by priority and shedding hopeless ones
+
+    At most `max_in_flight` calls run at once. Waiting calls are ordered by cost (prompt
+    size, so short requests go first), then by deadline. A call is rejected up front when
+    the estimated queue wait plus one call's duration exceeds its remaining deadline, and
+    while queued once it no longer has time for the call itself. When the queue is full
+    the costliest waiter is evicted in favour of a cheaper arrival. Call durations are
+    tracked as an exponential moving average seeded with `service_time_estimate`.
+    """
+
+    def __init__(self, max_in_flight: int = None, max_queue: int = None, service_time_estimate: float = None):
+        self.max_in_flight = settings.llm_max_in_flight if max_in_flight is None else max_in_flight
+        self.max_queue = settings.llm_queue_size if max_queue is None else max_queue
+        self.service_time = service_time_estimate or settings.llm_service_time_estimate
+        self.in_flight = 0
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._waits: deque = deque(maxlen=256)
+        self.counters = {"admitted": 0, "queued_total": 0, "shed_deadline": 0, "shed_queue_full": 0, "evicted": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    def retry_after(self) -> float:
+        """Seconds until the current queue is expected to drain"""
+        if not self.enabled:
+            return 1.0
+        rounds = math.ceil((len(self._queue) + 1) / self.max_in_flight)
+        return max(1.0, rounds * self.service_time)
+
+    def _expected_wait(self, key: tuple) -> float:
+        ahead = sum(1 for waiter in self._queue if waiter.key < key)
+        return math.ceil((ahead + 1) / self.max_in_flight) * self.service_time
+
+    def _reject(self, reason: str, message: str) -> AdmissionRejected:
+        self.counters[reason] += 1
+        return AdmissionRejected(message, self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self, cost: int = 0) -> AsyncIterator[None]:
+        """Hold one LLM slot for the duration of the block"""
+        if not self.enabled:
+            yield
+            return
+
+        await self._acquire(cost)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - started
+            self.service_time = 0.8 * self.service_time + 0.2 * duration
+            self._release()
+
+    async def _acquire(self, cost: int):
+        deadline = _deadline.get()
+        if self.in_flight < self.max_in_flight and not self._queue:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            self._waits.append(0.0)
+            return
+
+        now = time.monotonic()
+        key = (cost, deadline if deadline is not None else math.inf, next(self._sequence))
+        if deadline is not None and now + self._expected_wait(key) + self.service_time > deadline:
+            raise self._reject("shed_deadline", "LLM backend is saturated; request cannot finish before its deadline")
+
+        if len(self._queue) >= self.max_queue:
+            worst = max(self._queue)
+            if worst.key < key:
+                raise self._reject("shed_queue_full", "LLM request queue is full")
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            worst.future.set_exception(self._reject("evicted", "Evicted from the LLM queue by shorter requests"))
+
+        waiter = _Waiter(key, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self.counters["queued_total"] += 1
+
+        # Give up once there is no longer time for the call itself
+        timeout = None if deadline is None else max(deadline - self.service_time - now, 0)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=timeout)
+        except asyncio.TimeoutError:
+            if not (waiter.future.done() and waiter.future.exception() is None):
+                self._discard(waiter)
+                raise self._reject("shed_deadline", "Timed out waiting for an LLM slot")
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                self._release()  # the slot was handed over just as we were cancelled
+            else:
+                self._discard(waiter)
+            raise
+        self._waits.append(time.monotonic() - waiter.enqueued)
+
+    def _discard(self, waiter: _Waiter):
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+    def _release(self):
+        # Hand the slot straight to the best waiter so in_flight never dips below the cap
+        while self._queue:
+            waiter = heapq.heappop(self._queue)
+            if not waiter.future.done():
+                self.counters["admitted"] += 1
+                waiter.future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "enabled": self.enabled,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "service_time_estimate": round(self.service_time, 3),
+            "queue_wait_p50": round(waits[len(waits) // 2], 3) if waits else None,
+            "queue_wait_p95": round(waits[min(int(len(waits) * 0.95), len(waits) - 1)], 3) if waits else None,
+            **self.counters
+        }
+
+_admission_controller: Optional[AdmissionController] = None
+
+def get_admission_controller() -> AdmissionController:
+    """Shared admission controller for all LLM calls"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, AsyncGenerator, Awaitable, Callable, List, Optional, TypeVar
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class Backend:
+    """One Ollama node and its load and health state"""
+
+    def __init__(self, base_url: str, max_concurrent: int):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrent = max_concurrent
+        self.outstanding = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    @property
+    def saturated(self) -> bool:
+        return self.max_concurrent > 0 and self.outstanding >= self.max_concurrent
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "max_concurrent": self.max_concurrent,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+def _is_backend_failure(error: Exception) -> bool:
+    """Errors worth retrying on another node: connection problems and 5xx responses"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.RequestError)
+
+class BackendPool:
+    """Routes Ollama requests over several nodes
+
+    Requests go to the healthy backend with the fewest outstanding requests, waiting
+    when every backend is at its concurrency cap. A backend whose request fails with a
+    connection error or 5xx is taken out of rotation for `failure_cooldown` seconds
+    and the request fails over to the next one. A background task checks each node
+    with `OllamaClient.check_model` every `health_interval` seconds. With hedging on,
+    a non-streaming request still running after the `hedge_percentile` latency of
+    recent requests is duplicated on an idle backend and the first answer wins.
+    """
+
+    def __init__(
+        self,
+        base_urls: List[str],
+        model: str = None,
+        max_concurrent: int = None,
+        health_interval: float = None,
+        failure_cooldown: float = None,
+        hedge: bool = None,
+        hedge_percentile: float = None,
+        hedge_min_samples: int = None
+    ):
+        max_concurrent = settings.ollama_backend_max_concurrent if max_concurrent is None else max_concurrent
+        self.backends = [Backend(url, max_concurrent) for url in base_urls]
+        self.model = model or settings.ollama_model
+        self.health_interval = health_interval or settings.ollama_health_interval
+        self.failure_cooldown = failure_cooldown or settings.ollama_failure_cooldown
+        self.hedge = settings.ollama_hedge_enabled if hedge is None else hedge
+        self.hedge_percentile = hedge_percentile or settings.ollama_hedge_percentile
+        self.hedge_min_samples = hedge_min_samples or settings.ollama_hedge_min_samples
+        self.hedged = 0
+        self._latencies: deque = deque(maxlen=256)
+        self._available: Optional[asyncio.Condition] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def available(self) -> asyncio.Condition:
+        if self._available is None:
+            self._available = asyncio.Condition()
+        return self._available
+
+    async def start(self):
+        """Start the periodic health checks"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    async def _health_loop(self):
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_interval)
+
+    async def check_health(self):
+        """Check every backend once, taking failing ones out of rotation"""
+        from app.llm.ollama_client import OllamaClient
+
+        results = await asyncio.gather(*[
+            OllamaClient(model=self.model, base_url=backend.base_url).check_model()
+            for backend in self.backends
+        ])
+        for backend, healthy in zip(self.backends, results):
+            if healthy:
+                backend.down_until = 0.0
+            else:
+                logger.warning(f"Ollama backend {backend.base_url} failed its health check")
+                backend.down_until = time.monotonic() + self.health_interval
+        async with self.available:
+            self.available.notify_all()
+
+    def _pick(self, exclude: List[Backend]) -> Optional[Backend]:
+        candidates = [b for b in self.backends if b not in exclude]
+        # With every node marked down, keep trying them rather than failing outright
+        healthy = [b for b in candidates if b.healthy] or candidates
+        idle = [b for b in healthy if not b.saturated]
+        if not idle:
+            return None
+        return min(idle, key=lambda b: b.outstanding)
+
+    async def acquire(self, exclude: List[Backend] = None, wait: bool = True) -> Optional[Backend]:
+        """Reserve the least loaded backend, waiting for capacity unless wait=False"""
+        exclude = exclude or []
+        async with self.available:
+            backend = self._pick(exclude)
+            while backend is None and wait:
+                if len(exclude) >= len(self.backends):
+                    return None
+                await self.available.wait()
+                backend = self._pick(exclude)
+            if backend is not None:
+                backend.outstanding += 1
+                backend.requests += 1
+            return backend
+
+    async def release(self, backend: Backend):
+        async with self.available:
+            backend.outstanding -= 1
+            self.available.notify_all()
+
+    def _mark_failed(self, backend: Backend, error: Exception):
+        logger.warning(f"Ollama backend {backend.base_url} failed: {error}")
+        backend.failures += 1
+        backend.down_until = time.monotonic() + self.failure_cooldown
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.backends) < 2 or len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * self.hedge_percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+    async def _attempt(self, backend: Backend, send: Callable[[str], Awaitable[T]]) -> T:
+        """Run one request on a reserved backend, recording its latency"""
+        started = time.monotonic()
+        try:
+            result = await send(backend.base_url)
+            self._latencies.append(time.monotonic() - started)
+            return result
+        except Exception as e:
+            if _is_backend_failure(e):
+                self._mark_failed(backend, e)
+            raise
+        finally:
+            await self.release(backend)
+
+    async def request(self, send: Callable[[str], Awaitable[T]]) -> T:
+        """Run send(base_url) on the pool with failover and optional hedging"""
+        tried: List[Backend] = []
+        last_error: Optional[Exception] = None
+        while True:
+            backend = await self.acquire(exclude=tried)
+            if backend is None:
+                raise last_error or RuntimeError("No Ollama backend available")
+            tried.append(backend)
+            try:
+                return await self._hedged(backend, send, tried)
+            except Exception as e:
+                if not _is_backend_failure(e):
+                    raise
+                last_error = e
+
+    async def _hedged(self, backend: Backend, send: Callable[[str], Awaitable[T]], tried: List[Backend]) -> T:
+        tasks = {asyncio.create_task(self._attempt(backend, send))}
+        error: Optional[BaseException] = None
+        # Whatever happens here, including the caller being cancelled, no attempt outlives it
+        try:
+            delay = self._hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                backup_backend = None if done else await self.acquire(exclude=tried, wait=False)
+                if backup_backend is not None:
+                    tried.append(backup_backend)
+                    self.hedged += 1
+                    tasks.add(asyncio.create_task(self._attempt(backup_backend, send)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream(self, open_stream: Callable[[str], AsyncGenerator[T, None]]) -> AsyncGenerator[T, None]:
+        """Yield from open_stream(base_url), failing over until the first chunk arrives
+
+        Streams are not hedged: once output has been relayed it cannot be taken back.
+        """
+        tried: List[Backend] = []
+        last_error: Optional[Exception] = None
+        while True:
+            backend = await self.acquire(exclude=tried)
+            if backend is None:
+                raise last_error or RuntimeError("No Ollama backend available")
+            tried.append(backend)
+            started = False
+            chunks = open_stream(backend.base_url)
+            try:
+                async for chunk in chunks:
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if not _is_backend_failure(e):
+                    raise
+                self._mark_failed(backend, e)
+                if started:
+                    raise
+                last_error = e
+            finally:
+                await chunks.aclose()
+                await self.release(backend)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backends": [backend.stats() for backend in self.backends],
+            "hedged_requests": self.hedged,
+            "hedge_delay": self._hedge_delay()
+        }
+
+def configured_backend_urls() -> List[str]:
+    """Backends from Settings.ollama_backends, or the single ollama_host:ollama_port"""
+    urls = [url.strip() for url in settings.ollama_backends.split(",") if url.strip()]
+    return urls or [f"http://{settings.ollama_host}:{settings.ollama_port}"]
+
+_backend_pool: Optional[BackendPool] = None
+
+def get_backend_pool() -> BackendPool:
+    """Shared backend pool built from settings"""
+    global _backend_pool
+    if _backend_pool is None:
+        _backend_pool = BackendPool(configured_backend_urls())
+    return _backend_pool
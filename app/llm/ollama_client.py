@@ -1,19 +1,88 @@
 import httpx
 import json
 import logging
-from typing import Dict, Any, List, Optional, AsyncGenerator
+from typing import Dict, Any, List, Optional, Union, AsyncGenerator
 from app.core.config import settings
+from app.llm.admission import get_admission_controller
+from app.llm.backend_pool import BackendPool, get_backend_pool
+from app.llm.response_cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
+# App-scoped connection pool shared by every OllamaClient
+_http_client: Optional[httpx.AsyncClient] = None
+
+def _build_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client from settings"""
+    limits = httpx.Limits(
+        max_connections=settings.ollama_max_connections,
+        max_keepalive_connections=settings.ollama_max_keepalive_connections,
+        keepalive_expiry=settings.ollama_keepalive_expiry
+    )
+    timeout = httpx.Timeout(
+        settings.timeout_seconds,
+        connect=settings.ollama_connect_timeout
+    )
+    
+    http2 = settings.ollama_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+    
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Open the shared HTTP client (called from the app lifespan)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_http_client()
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client (called from the app lifespan)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it lazily outside the app lifespan"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_http_client()
+    return _http_client
+
+def _with_tag(model: str) -> str:
+    """Model name with Ollama's implicit ":latest" tag made explicit"""
+    return model if ":" in model.rsplit("/", 1)[-1] else f"{model}:latest"
+
 class OllamaClient:
     """Client for interacting with Ollama API"""
     
-    def __init__(self, host: str = None, port: int = None, model: str = None):
+    def __init__(
+        self,
+        host: str = None,
+        port: int = None,
+        model: str = None,
+        base_url: str = None,
+        pool: BackendPool = None
+    ):
         self.host = host or settings.ollama_host
         self.port = port or settings.ollama_port
         self.model = model or settings.ollama_model
-        self.base_url = f"http://{self.host}:{self.port}"
+        self.base_url = base_url or f"http://{self.host}:{self.port}"
+        if pool is None and (host or port or base_url):
+            # An explicitly addressed node bypasses the shared pool
+            pool = BackendPool([self.base_url], self.model, max_concurrent=0, hedge=False)
+        self.pool = pool or get_backend_pool()
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client"""
+        return get_http_client()
         
     async def generate(
         self,
@@ -23,7 +92,7 @@ class OllamaClient:
         stream: bool = False,
         **kwargs
     ) -> Dict[str, Any]:
-        """Generate response from Ollama"""
+        """Generate response from Ollama (an async iterator of chunks when stream=True)"""
         payload = {
             "model": self.model,
             "prompt": prompt,
@@ -35,69 +104,157 @@ class OllamaClient:
             payload["system"] = system
         if context:
             payload["context"] = context
+        
+        if stream:
+            return self._stream("/api/generate", payload)
             
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    timeout=settings.timeout_seconds
-                )
-                response.raise_for_status()
+        try:
+            async with get_admission_controller().slot(self._prompt_cost(payload)):
+                return await self.pool.request(lambda base_url: self._post(base_url, "/api/generate", payload))
                 
-                if stream:
-                    return response
-                else:
-                    return response.json()
-                    
-            except httpx.RequestError as e:
-                logger.error(f"Ollama request failed: {e}")
-                raise
+        except httpx.RequestError as e:
+            logger.error(f"Ollama request failed: {e}")
+            raise
     
     async def chat(
         self,
         messages: List[Dict[str, str]],
         stream: bool = False,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
         **kwargs
     ) -> Dict[str, Any]:
-        """Chat completion with Ollama"""
+        """Chat completion with Ollama (an async iterator of chunks when stream=True)
+
+        `format` is "json" or a JSON schema the response must conform to.
+        """
+        if stream:
+            return self.chat_stream(messages, format=format, **kwargs)
+        if format is not None:
+            kwargs["format"] = format
+        
         payload = {
             "model": self.model,
             "messages": messages,
-            "stream": stream,
+            "stream": False,
             **kwargs
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/chat",
-                    json=payload,
-                    timeout=settings.timeout_seconds
-                )
-                response.raise_for_status()
+        cache = get_response_cache()
+        if cache:
+            cached = await cache.get(self.model, messages, kwargs)
+            if cached is not None:
+                return cached
+        
+        try:
+            async with get_admission_controller().slot(self._prompt_cost(payload)):
+                result = await self.pool.request(lambda base_url: self._post(base_url, "/api/chat", payload))
                 
-                if stream:
-                    return response
-                else:
-                    return response.json()
+        except httpx.RequestError as e:
+            logger.error(f"Ollama chat request failed: {e}")
+            raise
+        
+        if cache:
+            await cache.put(self.model, messages, kwargs, result)
+        return result
+    
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream chat completion chunks from Ollama as they arrive"""
+        if format is not None:
+            kwargs["format"] = format
+        cache = get_response_cache()
+        if cache:
+            cached = await cache.get(self.model, messages, kwargs)
+            if cached is not None:
+                # Replay the cached completion as a single final chunk
+                yield {**cached, "done": True}
+                return
+        
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            **kwargs
+        }
+        parts: List[str] = []
+        async for chunk in self._stream("/api/chat", payload):
+            parts.append(chunk.get("message", {}).get("content", ""))
+            yield chunk
+            if chunk.get("done") and cache:
+                await cache.put(self.model, messages, kwargs, {
+                    "model": self.model,
+                    "message": {"role": "assistant", "content": "".join(parts)},
+                    "done": True
+                })
+    
+    async def _post(self, base_url: str, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST to one backend and decode the JSON response"""
+        response = await self.client.post(f"{base_url}{path}", json=payload)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _stream(
+        self,
+        path: str,
+        payload: Dict[str, Any]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield the NDJSON chunks of a streaming Ollama response from the backend pool"""
+        async with get_admission_controller().slot(self._prompt_cost(payload)):
+            async for chunk in self.pool.stream(lambda base_url: self._stream_from(base_url, path, payload)):
+                yield chunk
+    
+    def _prompt_cost(self, payload: Dict[str, Any]) -> int:
+        """Prompt size in characters; admission control serves smaller prompts first"""
+        messages = payload.get("messages", [])
+        return len(payload.get("prompt", "")) + len(payload.get("system", "")) + sum(
+            len(message.get("content", "")) for message in messages
+        )
+    
+    async def _stream_from(
+        self,
+        base_url: str,
+        path: str,
+        payload: Dict[str, Any]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield the NDJSON chunks of a streaming response from one backend"""
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{base_url}{path}",
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+                    yield chunk
+                    if chunk.get("done"):
+                        break
                     
-            except httpx.RequestError as e:
-                logger.error(f"Ollama chat request failed: {e}")
-                raise
+        except httpx.RequestError as e:
+            logger.error(f"Ollama streaming request failed: {e}")
+            raise
     
     async def check_model(self) -> bool:
         """Check if model is available"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/tags",
-                    timeout=10
-                )
-                response.raise_for_status()
-                
-                models = response.json().get("models", [])
-                return any(model.get("name") == self.model for model in models)
+            response = await self.client.get(
+                f"{self.base_url}/api/tags",
+                timeout=10
+            )
+            response.raise_for_status()
+            
+            models = response.json().get("models", [])
+            # Ollama lists "llama3.2" as "llama3.2:latest"
+            wanted = _with_tag(self.model)
+            return any(_with_tag(model.get("name", "")) == wanted for model in models)
                 
         except Exception as e:
             logger.error(f"Failed to check model availability: {e}")
@@ -109,11 +266,10 @@ class OllamaClient:
             "name": self.model
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/pull",
-                json=payload,
-                timeout=300  # 5 minutes for model pull
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.client.post(
+            f"{self.base_url}/api/pull",
+            json=payload,
+            timeout=300  # 5 minutes for model pull
+        )
+        response.raise_for_status()
+        return response.json()
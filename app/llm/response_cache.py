@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 512
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def embed_text(text: str) -> np.ndarray:
+    """Local hashed bag-of-words embedding (unigrams + bigrams), L2-normalized"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % EMBEDDING_DIM
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class ResponseCache:
+    """Cache of LLM chat responses persisted in SQLite under Settings.vector_store_path
+
+    Exact lookups are keyed on (model, messages, options). In semantic mode a miss
+    falls back to the most similar cached prompt whose earlier messages, model and
+    options are identical, reusing its answer when the cosine similarity of the last
+    message's embedding reaches the threshold. Entries expire after a TTL and the
+    least recently used are evicted beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        ttl_seconds: float = None,
+        max_entries: int = None,
+        semantic: bool = None,
+        similarity_threshold: float = None
+    ):
+        self.path = path or os.path.join(settings.vector_store_path, "llm_cache.sqlite")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.llm_cache_ttl_seconds
+        self.max_entries = max_entries or settings.llm_cache_max_entries
+        self.semantic = settings.llm_cache_semantic if semantic is None else semantic
+        self.similarity_threshold = similarity_threshold or settings.llm_cache_similarity_threshold
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    scope TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    embedding BLOB,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_scope ON responses (scope)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._conn.commit()
+        return self._conn
+
+    def _keys(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Tuple[str, str]:
+        """Exact key over everything; scope key over everything except the last message"""
+        def digest(payload: Any) -> str:
+            return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        return (
+            digest([model, messages, options]),
+            digest([model, messages[:-1], options, messages[-1].get("role") if messages else None])
+        )
+
+    async def get(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached response for the request, or None"""
+        return await asyncio.to_thread(self._get, model, messages, options)
+
+    async def put(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any], response: Dict[str, Any]):
+        """Store a completed response"""
+        await asyncio.to_thread(self._put, model, messages, options, response)
+
+    def _get(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key, scope = self._keys(model, messages, options)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT key, response FROM responses WHERE key = ? AND created >= ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+
+            if row is None and self.semantic and messages:
+                row = self._nearest(conn, scope, messages[-1].get("content", ""), now)
+                if row is not None:
+                    self.semantic_hits += 1
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, row[0]))
+            conn.commit()
+            return json.loads(row[1])
+
+    def _nearest(self, conn: sqlite3.Connection, scope: str, content: str, now: float) -> Optional[Tuple[str, str]]:
+        rows = conn.execute(
+            "SELECT key, response, embedding FROM responses WHERE scope = ? AND created >= ? AND embedding IS NOT NULL",
+            (scope, now - self.ttl_seconds)
+        ).fetchall()
+        if not rows:
+            return None
+
+        query = embed_text(content)
+        matrix = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32).reshape(len(rows), EMBEDDING_DIM)
+        similarities = matrix @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return rows[best][0], rows[best][1]
+
+    def _put(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any], response: Dict[str, Any]):
+        key, scope = self._keys(model, messages, options)
+        embedding = embed_text(messages[-1].get("content", "")).tobytes() if self.semantic and messages else None
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, response, embedding, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, scope, json.dumps(response, default=str), embedding, now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and entry count"""
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "entries": entries,
+                "semantic": self.semantic
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Shared response cache, or None when caching is disabled"""
+    global _response_cache
+    if not settings.llm_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+def close_response_cache():
+    """Close the shared response cache's SQLite connection (called from the app lifespan)"""
+    global _response_cache
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
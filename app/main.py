@@ -1,8 +1,17 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.jobs import job_runner, router as jobs_router
 from app.api.new_endpoints import router as new_router
 from app.core.config import settings
+from app.llm.admission import get_admission_controller
+from app.llm.backend_pool import get_backend_pool
+from app.llm.ollama_client import open_http_client, close_http_client
+from app.llm.response_cache import close_response_cache
+from app.tools.executor import shutdown_executor
+from app.utils.chart_renderer import chart_renderer
 
 # Configure logging
 logging.basicConfig(
@@ -11,11 +20,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open and close app-scoped resources"""
+    await open_http_client()
+    await get_backend_pool().start()
+    await job_runner.start()
+    warm_charts = asyncio.create_task(_warm_chart_renderer())
+    try:
+        yield
+    finally:
+        warm_charts.cancel()
+        await job_runner.stop()
+        await get_backend_pool().stop()
+        await close_http_client()
+        close_response_cache()
+        shutdown_executor()
+        chart_renderer.shutdown()
+
+async def _warm_chart_renderer():
+    """Start the chart workers in the background so startup isn't delayed"""
+    try:
+        await chart_renderer.start()
+    except Exception as e:
+        logger.warning(f"Could not pre-warm chart renderer: {e}")
+
 # Create FastAPI app
 app = FastAPI(
     title="Agentic Data Analyst API",
     description="A modern, agentic AI-powered data analysis system using Ollama",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -29,6 +64,7 @@ app.add_middleware(
 
 # Include API routes
 app.include_router(new_router)
+app.include_router(jobs_router)
 
 @app.get("/")
 async def root():
@@ -49,7 +85,12 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": "2.0.0"}
+    return {
+        "status": "healthy",
+        "version": "2.0.0",
+        "llm": get_backend_pool().stats(),
+        "admission": get_admission_controller().stats()
+    }
 
 @app.get("/tools")
 async def list_tools():
@@ -57,6 +98,20 @@ async def list_tools():
     from app.tools.registry import tool_manager
     return tool_manager.list_available_tools()
 
+@app.get("/cache")
+async def cache_stats():
+    """Cache hit/miss counters"""
+    from app.utils.dataset_cache import dataset_cache
+    from app.utils.dataset_profile import dataset_profiler
+    from app.llm.response_cache import get_response_cache
+    response_cache = get_response_cache()
+    return {
+        "datasets": dataset_cache.stats(),
+        "profiles": dataset_profiler.stats(),
+        "charts": chart_renderer.stats(),
+        "llm": response_cache.stats() if response_cache else None
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,10 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
 import logging
+import os
+from app.core.config import settings
+from app.tools.tool_index import ToolIndex
+from app.utils.fingerprint import fingerprint_file
 
 logger = logging.getLogger(__name__)
 
+# Parameter through which a CPU-bound tool receives its already loaded data file
+DATA_FRAME_PARAMETER = "data_frame"
+
 class ToolResult(BaseModel):
     success: bool
     data: Any = None
@@ -18,9 +29,60 @@ class ToolMetadata(BaseModel):
     required: List[str]
     examples: List[str] = []
 
+class ToolResultCache:
+    """LRU memo of successful tool results keyed on tool, parameters and data content
+
+    A `file_path` parameter is keyed by the file's content hash rather than its path,
+    so the same data uploaded again (to a different spool path) still hits.
+    """
+    
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or settings.tool_cache_max_entries
+        self._entries: "OrderedDict[str, ToolResult]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+    
+    async def make_key(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+        """Canonical cache key for a tool call"""
+        canonical = dict(parameters)
+        file_path = canonical.get("file_path")
+        if isinstance(file_path, str) and os.path.isfile(file_path):
+            canonical["file_path"] = "sha256:" + await asyncio.to_thread(fingerprint_file, file_path)
+        payload = json.dumps([tool_name, canonical], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, tool_name: str, key: str) -> Optional["ToolResult"]:
+        stats = self._stats.setdefault(tool_name, {"hits": 0, "misses": 0})
+        result = self._entries.get(key)
+        if result is None:
+            stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        stats["hits"] += 1
+        return result
+    
+    def put(self, key: str, result: "ToolResult"):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def stats(self, tool_name: str) -> Dict[str, int]:
+        """Hit/miss counters for one tool"""
+        return dict(self._stats.get(tool_name, {"hits": 0, "misses": 0}))
+
+# Global tool result cache instance
+tool_result_cache = ToolResultCache()
+
 class BaseTool(ABC):
     """Base class for all tools"""
     
+    # CPU-bound tools are dispatched to the tool executor pool instead of the event loop
+    cpu_bound: bool = False
+    
+    # Pure tools (output depends only on parameters and data) may be memoized;
+    # side-effecting tools such as scrapers must leave this off
+    cacheable: bool = False
+    
     def __init__(self):
         self.metadata = self._get_metadata()
     
@@ -34,6 +96,23 @@ class BaseTool(ABC):
         """Execute the tool with given parameters"""
         pass
     
+    async def invoke(self, parameters: Dict[str, Any]) -> ToolResult:
+        """Execute the tool, reusing a memoized result for cacheable tools"""
+        if not (self.cacheable and settings.tool_cache_enabled):
+            return await self.execute(parameters)
+        
+        name = self.metadata.name
+        key = await tool_result_cache.make_key(name, parameters)
+        cached = tool_result_cache.get(name, key)
+        if cached is not None:
+            return cached
+        
+        result = await self.execute(parameters)
+        # Sampled answers must not stand in for exact ones on a later call
+        if result.success and not result.metadata.get("approximate"):
+            tool_result_cache.put(key, result)
+        return result
+    
     def validate_parameters(self, parameters: Dict[str, Any]) -> bool:
         """Validate required parameters"""
         required = self.metadata.required
@@ -43,28 +122,74 @@ class BaseTool(ABC):
         """Return usage examples"""
         return self.metadata.examples
 
+class CPUBoundTool(BaseTool):
+    """Base class for tools whose work is synchronous and CPU-heavy (pandas, plotting, ...)
+
+    Subclasses implement `execute_sync`; `execute` runs it on the configured thread
+    or process pool so the event loop stays responsive. In process mode, DataFrame
+    parameters are handed to workers through shared memory rather than pickled.
+    Tools that work on a whole data file return it from `frame_source`; the frame
+    is then loaded once through the parent's dataset cache and passed to the worker
+    as `DATA_FRAME_PARAMETER`.
+    """
+    
+    cpu_bound = True
+    
+    def frame_source(self, parameters: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """(file path, file type) of the data file execute_sync will load, if any"""
+        return None
+    
+    @abstractmethod
+    def execute_sync(self, parameters: Dict[str, Any]) -> ToolResult:
+        """Execute the tool synchronously inside a pool worker"""
+        pass
+    
+    async def execute(self, parameters: Dict[str, Any]) -> ToolResult:
+        """Dispatch the tool to the CPU-bound executor pool"""
+        from app.tools.executor import run_cpu_bound
+        return await run_cpu_bound(self, parameters)
+
 class ToolRegistry:
     """Registry for dynamic tool discovery and management"""
     
     def __init__(self):
         self._tools: Dict[str, BaseTool] = {}
+        self._metadata: Dict[str, ToolMetadata] = {}
+        self._loaders: Dict[str, Callable[[], BaseTool]] = {}
+        self._index = ToolIndex()
     
     def register(self, tool: BaseTool):
         """Register a new tool"""
         self._tools[tool.metadata.name] = tool
+        self._metadata[tool.metadata.name] = tool.metadata
+        self._index.add(tool.metadata)
+    
+    def register_lazy(self, metadata: ToolMetadata, loader: Callable[[], BaseTool]):
+        """Register a tool by metadata; loader imports and instantiates it on first use"""
+        self._metadata[metadata.name] = metadata
+        self._loaders[metadata.name] = loader
+        self._index.add(metadata)
     
     def get_tool(self, name: str) -> Optional[BaseTool]:
-        """Get tool by name"""
-        return self._tools.get(name)
+        """Get tool by name, loading it if it was registered lazily"""
+        tool = self._tools.get(name)
+        if tool is None and name in self._loaders:
+            try:
+                tool = self._loaders[name]()
+            except Exception as e:
+                logger.warning(f"Failed to load tool {name}: {e}")
+                return None
+            self._tools[name] = tool
+        return tool
+    
+    def get_metadata(self, name: str) -> Optional[ToolMetadata]:
+        """Metadata of a tool without loading it"""
+        return self._metadata.get(name)
     
     def list_tools(self) -> List[ToolMetadata]:
         """List all available tools"""
-        return [tool.metadata for tool in self._tools.values()]
-    
-    def search_tools(self, query: str) -> List[ToolMetadata]:
-        """Search tools by description or name"""
-        query = query.lower()
-        return [
-            tool.metadata for tool in self._tools.values()
-            if query in tool.metadata.name.lower() or query in tool.metadata.description.lower()
-        ]
+        return list(self._metadata.values())
+    
+    def search_tools(self, query: str, top_k: Optional[int] = None) -> List[ToolMetadata]:
+        """Tools most relevant to the query, best first"""
+        return [self._metadata[name] for name, _ in self._index.search(query, top_k)]
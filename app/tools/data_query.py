@@ -0,0 +1,87 @@
+import logging
+from typing import Dict, Any
+from app.tools.base_tool import CPUBoundTool, ToolMetadata, ToolResult
+from app.utils.query_engine import QueryEngine
+
+logger = logging.getLogger(__name__)
+
+class QueryDataTool(CPUBoundTool):
+    """Run SQL over an uploaded file with DuckDB"""
+
+    cacheable = True
+
+    def _get_metadata(self) -> ToolMetadata:
+        return ToolMetadata(
+            name="query_data",
+            description="Query and filter a CSV, Parquet or JSON file with SQL. The file is available as the table `data`.",
+            parameters={
+                "file_path": {"type": "string", "description": "Path of the data file"},
+                "sql": {"type": "string", "description": "A single SELECT statement over the table `data`"},
+                "max_rows": {"type": "integer", "description": "Maximum number of rows to return"}
+            },
+            required=["file_path", "sql"],
+            examples=[
+                '@query_data({"sql": "SELECT region, SUM(sales) AS total FROM data GROUP BY region ORDER BY total DESC"})'
+            ]
+        )
+
+    def execute_sync(self, parameters: Dict[str, Any]) -> ToolResult:
+        if not self.validate_parameters(parameters):
+            return ToolResult(success=False, error=f"Missing required parameters: {self.metadata.required}")
+        try:
+            result = QueryEngine().query(
+                parameters["file_path"],
+                parameters["sql"],
+                parameters.get("max_rows")
+            )
+            return ToolResult(success=True, data=result, metadata={"engine": "duckdb"})
+        except Exception as e:
+            logger.error(f"query_data failed: {e}")
+            return ToolResult(success=False, error=str(e))
+
+class AnalyzeDataTool(CPUBoundTool):
+    """Aggregate an uploaded file with DuckDB without loading it into memory"""
+
+    cacheable = True
+
+    def _get_metadata(self) -> ToolMetadata:
+        return ToolMetadata(
+            name="analyze_data",
+            description="Statistical analysis of a data file: group-by aggregates (sum, mean, median, min, max, count, nunique, std) with optional filters, or per-column summary statistics when no metrics are given.",
+            parameters={
+                "file_path": {"type": "string", "description": "Path of the data file"},
+                "group_by": {"type": "array", "items": {"type": "string"}, "description": "Columns to group by"},
+                "metrics": {"type": "object", "description": "Mapping of column to aggregation or list of aggregations"},
+                "filters": {"type": "array", "items": {"type": "object"}, "description": "Conditions like {\"column\": \"region\", \"op\": \"=\", \"value\": \"East\"}"},
+                "order_by": {"type": "string", "description": "Output column to sort by, e.g. sales_sum"},
+                "descending": {"type": "boolean", "description": "Sort descending (default true)"},
+                "limit": {"type": "integer", "description": "Maximum number of rows to return"}
+            },
+            required=["file_path"],
+            examples=[
+                '@analyze_data({"group_by": ["region"], "metrics": {"sales": "sum"}, "order_by": "sales_sum"})',
+                '@analyze_data({})'
+            ]
+        )
+
+    def execute_sync(self, parameters: Dict[str, Any]) -> ToolResult:
+        if not self.validate_parameters(parameters):
+            return ToolResult(success=False, error=f"Missing required parameters: {self.metadata.required}")
+        try:
+            engine = QueryEngine()
+            if not parameters.get("group_by") and not parameters.get("metrics"):
+                result = engine.summarize(parameters["file_path"])
+            else:
+                result = engine.aggregate(
+                    parameters["file_path"],
+                    group_by=parameters.get("group_by"),
+                    metrics=parameters.get("metrics"),
+                    filters=parameters.get("filters"),
+                    order_by=parameters.get("order_by"),
+                    descending=parameters.get("descending", True),
+                    limit=parameters.get("limit")
+                )
+            return ToolResult(success=True, data=result, metadata={"engine": "duckdb"})
+        except Exception as e:
+            logger.error(f"analyze_data failed: {e}")
+            return ToolResult(success=False, error=str(e))
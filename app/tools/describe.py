@@ -0,0 +1,122 @@
+import logging
+import math
+import os
+import time
+from typing import Dict, Any, Optional, Tuple
+from app.core.config import settings
+from app.tools.base_tool import DATA_FRAME_PARAMETER, CPUBoundTool, ToolMetadata, ToolResult
+from app.utils.file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+class DescribeDataTool(CPUBoundTool):
+    """Summary statistics, group-by aggregates and correlations of an uploaded file
+
+    Files up to `chunked_analysis_threshold_bytes` are loaded (through the dataset
+    cache) and described exactly with pandas; larger CSVs are streamed in chunks
+    with mergeable sketches, so they never have to fit in memory. In approximate
+    mode, picked automatically when an exact scan would not fit the request's
+    latency budget, CSV statistics come from a sample and carry confidence
+    intervals; other formats are always described exactly.
+    """
+
+    cacheable = True
+
+    def _get_metadata(self) -> ToolMetadata:
+        return ToolMetadata(
+            name="describe_data",
+            description="Describe a data file of any size: per-column count, nulls, distinct, mean, std, min, max and median, correlations between numeric columns, and optional group-by aggregates (count, sum, mean, min, max, std, median). Very large files may be answered from a sample, with confidence intervals.",
+            parameters={
+                "file_path": {"type": "string", "description": "Path of the data file"},
+                "group_by": {"type": "array", "items": {"type": "string"}, "description": "Columns to group by"},
+                "metrics": {"type": "object", "description": "Mapping of column to aggregation or list of aggregations"},
+                "correlation": {"type": "boolean", "description": "Include the correlation matrix (default true)"},
+                "order_by": {"type": "string", "description": "Group output column to sort by, e.g. sales_median"},
+                "descending": {"type": "boolean", "description": "Sort descending (default true)"},
+                "limit": {"type": "integer", "description": "Maximum number of groups to return"},
+                "mode": {"type": "string", "enum": ["auto", "exact", "approximate"], "description": "auto samples only when an exact scan would take too long"},
+                "confidence": {"type": "number", "description": "Confidence level of approximate intervals (default 0.95)"}
+            },
+            required=["file_path"],
+            examples=[
+                '@describe_data({})',
+                '@describe_data({"group_by": ["region"], "metrics": {"sales": ["sum", "median"]}, "order_by": "sales_sum"})'
+            ]
+        )
+
+    async def execute(self, parameters: Dict[str, Any]) -> ToolResult:
+        """Pick exact or approximate mode from the request's deadline, then run on the pool"""
+        from app.llm.admission import remaining_time
+        from app.utils.approximate import choose_mode, scan_rate
+
+        file_path = parameters.get("file_path")
+        mode = choose_mode(file_path, parameters.get("mode", "auto"), remaining_time())
+        started = time.monotonic()
+        result = await super().execute({**parameters, "mode": mode})
+        if result.success and result.metadata.get("mode") == "chunked":
+            scan_rate.record(os.path.getsize(file_path), time.monotonic() - started)
+        return result
+
+    def frame_source(self, parameters: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """The file is loaded whole only for the exact in-memory path"""
+        file_path = parameters.get("file_path")
+        if not isinstance(file_path, str) or not os.path.isfile(file_path):
+            return None
+        file_type = os.path.splitext(file_path)[1][1:].lower()
+        if parameters.get("mode") == "approximate" and file_type == 'csv':
+            return None
+        if FileHandler.needs_chunked_analysis(file_path, file_type):
+            return None
+        return file_path, file_type
+
+    def execute_sync(self, parameters: Dict[str, Any]) -> ToolResult:
+        if not self.validate_parameters(parameters):
+            return ToolResult(success=False, error=f"Missing required parameters: {self.metadata.required}")
+        try:
+            from app.utils.chunked_analysis import ChunkedCSVAnalyzer, summarize_frame
+
+            file_path = parameters["file_path"]
+            file_type = os.path.splitext(file_path)[1][1:].lower()
+            options = {
+                "group_by": parameters.get("group_by"),
+                "metrics": parameters.get("metrics"),
+                "correlation": parameters.get("correlation", True),
+                "order_by": parameters.get("order_by"),
+                "descending": parameters.get("descending", True),
+                "limit": parameters.get("limit")
+            }
+            if isinstance(options["group_by"], str):
+                options["group_by"] = [options["group_by"]]
+
+            file_handler = FileHandler()
+            approximate = parameters.get("mode") == "approximate"
+            note = None
+            if approximate and file_type != 'csv':
+                # Sampling only saves time when rows can be read without loading the file
+                approximate = False
+                note = f"approximate mode samples CSV files only; this {file_type} file was described exactly"
+            if approximate:
+                from app.utils.approximate import ApproximateAnalyzer
+
+                result, metadata = ApproximateAnalyzer(confidence=parameters.get("confidence")).analyze(file_path, **options)
+            elif parameters.get(DATA_FRAME_PARAMETER) is None and file_handler.needs_chunked_analysis(file_path, file_type):
+                analyzer = ChunkedCSVAnalyzer()
+                result = analyzer.analyze(file_path, **options)
+                metadata = {
+                    "mode": "chunked",
+                    "chunks": result.pop("chunks"),
+                    "workers": analyzer.workers,
+                    "distinct_relative_error": round(1.04 / math.sqrt(2 ** settings.hll_precision), 4)
+                }
+            else:
+                frame = parameters.get(DATA_FRAME_PARAMETER)
+                if frame is None:
+                    frame = file_handler.load_data_file_sync(file_path, file_type)
+                result = summarize_frame(frame, **options)
+                metadata = {"mode": "in_memory"}
+            if note:
+                metadata["notes"] = note
+            return ToolResult(success=True, data=result, metadata=metadata)
+        except Exception as e:
+            logger.error(f"describe_data failed: {e}")
+            return ToolResult(success=False, error=str(e))
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Type
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# App-scoped pool for CPU-bound tool work
+_executor: Optional[Executor] = None
+
+# Tool instances cached per worker process
+_worker_tools: Dict[type, Any] = {}
+
+def get_executor() -> Executor:
+    """Get the CPU-bound tool pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        workers = settings.tool_executor_workers
+        if settings.tool_executor == "process":
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="tool-worker"
+            )
+        logger.info(f"Started {settings.tool_executor} pool for CPU-bound tools ({workers} workers)")
+    return _executor
+
+def shutdown_executor():
+    """Shut down the CPU-bound tool pool (called from the app lifespan)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+class SharedFrame:
+    """Picklable handle to a DataFrame stored as an Arrow IPC stream in shared memory"""
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+    @classmethod
+    def create(cls, df) -> Tuple["SharedFrame", Any]:
+        """Copy a DataFrame into a new shared memory block, returning the handle and the block"""
+        import pyarrow as pa
+        from multiprocessing import shared_memory
+
+        table = pa.Table.from_pandas(df)
+
+        # Measure the stream first so it can be written straight into shared memory
+        sizer = pa.MockOutputStream()
+        with pa.ipc.new_stream(sizer, table.schema) as writer:
+            writer.write_table(table)
+        size = sizer.size()
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            sink = pa.FixedSizeBufferWriter(pa.py_buffer(shm.buf))
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+        return cls(shm.name, size), shm
+
+    def load(self) -> Tuple[Any, Any]:
+        """Attach to the shared block and read it back, returning the DataFrame and the block"""
+        import pyarrow as pa
+        from multiprocessing import shared_memory
+
+        # Pool workers share the parent's resource tracker, so the creator's unlink
+        # remains the single point of cleanup for the block
+        shm = shared_memory.SharedMemory(name=self.name)
+        reader = pa.ipc.open_stream(pa.py_buffer(shm.buf[:self.size]))
+        return reader.read_all().to_pandas(), shm
+
+def _share_frames(parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Any]]:
+    """Replace DataFrame parameters with shared memory handles"""
+    try:
+        import pandas as pd
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return parameters, []
+
+    shared = dict(parameters)
+    blocks = []
+    try:
+        for key, value in parameters.items():
+            if isinstance(value, pd.DataFrame):
+                handle, shm = SharedFrame.create(value)
+                shared[key] = handle
+                blocks.append(shm)
+    except Exception:
+        _release_blocks(blocks, unlink=True)
+        raise
+    return shared, blocks
+
+def _release_blocks(blocks: List[Any], unlink: bool):
+    """Close (and optionally unlink) shared memory blocks"""
+    for shm in blocks:
+        try:
+            shm.close()
+            if unlink:
+                shm.unlink()
+        except Exception as e:
+            logger.debug(f"Failed to release shared memory block: {e}")
+
+def _execute_in_worker(tool_cls: Type, parameters: Dict[str, Any]):
+    """Process-pool entry point: rebuild shared frames and run the tool synchronously"""
+    tool = _worker_tools.get(tool_cls)
+    if tool is None:
+        tool = _worker_tools[tool_cls] = tool_cls()
+
+    blocks = []
+    resolved = dict(parameters)
+    for key, value in parameters.items():
+        if isinstance(value, SharedFrame):
+            resolved[key], shm = value.load()
+            blocks.append(shm)
+
+    try:
+        return tool.execute_sync(resolved)
+    finally:
+        del resolved
+        _release_blocks(blocks, unlink=False)
+
+async def run_cpu_bound(tool, parameters: Dict[str, Any]):
+    """Run a CPU-bound tool's execute_sync off the event loop"""
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+
+    if not isinstance(executor, ProcessPoolExecutor):
+        return await loop.run_in_executor(executor, tool.execute_sync, parameters)
+
+    source = tool.frame_source(parameters)
+    if source is not None:
+        # Workers have their own dataset caches; hand them the parent's parsed frame instead
+        from app.tools.base_tool import DATA_FRAME_PARAMETER
+        from app.utils.file_handler import FileHandler
+
+        try:
+            frame = await FileHandler().load_data_file(*source)
+            parameters = {**parameters, DATA_FRAME_PARAMETER: frame}
+        except Exception as e:
+            logger.debug(f"Leaving {source[0]} for the worker to load: {e}")
+
+    shared, blocks = _share_frames(parameters)
+    try:
+        return await loop.run_in_executor(executor, _execute_in_worker, type(tool), shared)
+    finally:
+        _release_blocks(blocks, unlink=True)
@@ -0,0 +1,131 @@
+import importlib
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel
+from app.core.config import settings
+from app.tools.base_tool import BaseTool, ToolMetadata
+
+logger = logging.getLogger(__name__)
+
+# Infrastructure modules in the tools package that never define tools
+NON_TOOL_MODULES = {"base_tool.py", "registry.py", "manifest.py", "executor.py", "tool_index.py"}
+
+MANIFEST_VERSION = 1
+
+class ToolManifestEntry(BaseModel):
+    name: str
+    module: str
+    class_name: str
+    metadata: ToolMetadata
+    cpu_bound: bool = False
+    cacheable: bool = False
+
+class ToolManifest:
+    """Disk-cached index of tool name -> module, class and metadata
+
+    Building the manifest imports every tool module once; afterwards it is read from
+    `cache_path` for as long as the modification times and sizes of the files in the
+    tools package are unchanged, so startup and tool listing don't import tool modules
+    (or their pandas/plotting dependencies) at all.
+    """
+
+    def __init__(self, tools_dir: Path = None, cache_path: str = None):
+        self.tools_dir = tools_dir or Path(__file__).parent
+        self.cache_path = Path(cache_path or settings.tool_manifest_path)
+
+    def load(self) -> Dict[str, ToolManifestEntry]:
+        """Entries from the on-disk manifest, rebuilding it when tool sources changed"""
+        signature = self._signature()
+        cached = self._read(signature)
+        if cached is not None:
+            return cached
+
+        entries = self.build()
+        self._write(signature, entries)
+        return entries
+
+    def build(self) -> Dict[str, ToolManifestEntry]:
+        """Import every tool module and record its tools"""
+        entries: Dict[str, ToolManifestEntry] = {}
+        for tool_file in self._tool_files():
+            module_path = self._module_path(tool_file)
+            try:
+                module = importlib.import_module(module_path)
+
+                # Find all concrete classes defined here that inherit from BaseTool
+                for class_name, obj in inspect.getmembers(module):
+                    if (inspect.isclass(obj) and
+                        issubclass(obj, BaseTool) and
+                        obj.__module__ == module.__name__ and
+                        not inspect.isabstract(obj)):
+
+                        tool = obj()
+                        entries[tool.metadata.name] = ToolManifestEntry(
+                            name=tool.metadata.name,
+                            module=module_path,
+                            class_name=class_name,
+                            metadata=tool.metadata,
+                            cpu_bound=tool.cpu_bound,
+                            cacheable=tool.cacheable
+                        )
+
+            except Exception as e:
+                logger.warning(f"Failed to load tool from {tool_file}: {e}")
+        return entries
+
+    def _tool_files(self) -> List[Path]:
+        return sorted(
+            tool_file for tool_file in self.tools_dir.rglob("*.py")
+            if not tool_file.name.startswith("_") and tool_file.name not in NON_TOOL_MODULES
+        )
+
+    def _module_path(self, tool_file: Path) -> str:
+        relative_path = tool_file.parent.relative_to(self.tools_dir)
+        if str(relative_path) == ".":
+            return f"app.tools.{tool_file.stem}"
+        return f"app.tools.{'.'.join(relative_path.parts)}.{tool_file.stem}"
+
+    def _signature(self) -> Dict[str, List[int]]:
+        """Modification time and size of every source file in the tools package"""
+        signature = {}
+        for source in sorted(self.tools_dir.rglob("*.py")):
+            stat = source.stat()
+            signature[str(source.relative_to(self.tools_dir))] = [stat.st_mtime_ns, stat.st_size]
+        return signature
+
+    def _read(self, signature: Dict[str, List[int]]) -> Optional[Dict[str, ToolManifestEntry]]:
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if cached.get("version") != MANIFEST_VERSION or cached.get("signature") != signature:
+                return None
+            return {name: ToolManifestEntry(**entry) for name, entry in cached["tools"].items()}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable tool manifest {self.cache_path}: {e}")
+            return None
+
+    def _write(self, signature: Dict[str, List[int]], entries: Dict[str, ToolManifestEntry]):
+        payload = {
+            "version": MANIFEST_VERSION,
+            "signature": signature,
+            "tools": {name: entry.dict() for name, entry in entries.items()}
+        }
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write tool manifest {self.cache_path}: {e}")
+
+if __name__ == "__main__":
+    # Pre-build the manifest, e.g. at image build time
+    tools = ToolManifest().load()
+    print(f"Wrote {len(tools)} tools to {settings.tool_manifest_path}")
@@ -1,9 +1,8 @@
 import importlib
-import inspect
 import logging
-from pathlib import Path
-from typing import List, Type
-from app.tools.base_tool import BaseTool, ToolRegistry
+from typing import Callable, List
+from app.tools.base_tool import BaseTool, ToolRegistry, tool_result_cache
+from app.tools.manifest import ToolManifest, ToolManifestEntry
 
 logger = logging.getLogger(__name__)
 
@@ -12,41 +11,21 @@ class ToolManager:
     
     def __init__(self):
         self.registry = ToolRegistry()
+        self._entries = {}
         self._discover_tools()
     
     def _discover_tools(self):
-        """Automatically discover and register tools from the tools directory"""
-        tools_dir = Path(__file__).parent
-        
-        # Find all Python files in tools directory
-        for tool_file in tools_dir.rglob("*.py"):
-            if tool_file.name.startswith("_") or tool_file.name == "base_tool.py":
-                continue
-            
-            try:
-                # Import the module
-                module_name = tool_file.stem
-                relative_path = tool_file.parent.relative_to(tools_dir)
-                
-                if str(relative_path) == ".":
-                    module_path = f"app.tools.{module_name}"
-                else:
-                    module_path = f"app.tools.{'.'.join(relative_path.parts)}.{module_name}"
-                
-                module = importlib.import_module(module_path)
-                
-                # Find all classes that inherit from BaseTool
-                for name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and 
-                        issubclass(obj, BaseTool) and 
-                        obj != BaseTool):
-                        
-                        tool_instance = obj()
-                        self.registry.register(tool_instance)
-                        logger.info(f"Registered tool: {tool_instance.metadata.name}")
-                        
-            except Exception as e:
-                logger.warning(f"Failed to load tool from {tool_file}: {e}")
+        """Register tools from the discovery manifest; modules are imported on first use"""
+        self._entries = ToolManifest().load()
+        for entry in self._entries.values():
+            self.registry.register_lazy(entry.metadata, self._loader(entry))
+            logger.info(f"Registered tool: {entry.name}")
+    
+    def _loader(self, entry: ToolManifestEntry) -> Callable[[], BaseTool]:
+        def load() -> BaseTool:
+            module = importlib.import_module(entry.module)
+            return getattr(module, entry.class_name)()
+        return load
     
     def get_registry(self) -> ToolRegistry:
         """Get the tool registry"""
@@ -56,12 +35,15 @@ class ToolManager:
         """List all available tools with their metadata"""
         return [
             {
-                "name": tool.metadata.name,
-                "description": tool.metadata.description,
-                "parameters": tool.metadata.parameters,
-                "examples": tool.metadata.examples
+                "name": entry.name,
+                "description": entry.metadata.description,
+                "parameters": entry.metadata.parameters,
+                "examples": entry.metadata.examples,
+                "cpu_bound": entry.cpu_bound,
+                "cacheable": entry.cacheable,
+                "cache": tool_result_cache.stats(entry.name)
             }
-            for tool in self.registry._tools.values()
+            for entry in self._entries.values()
         ]
 
 # Global tool manager instance
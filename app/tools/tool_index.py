@@ -0,0 +1,97 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.tools.base_tool import ToolMetadata
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "ed", "s")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "for", "from", "how", "i",
+    "in", "is", "it", "me", "of", "on", "or", "the", "this", "to", "what", "which",
+    "with", "when", "where", "who", "you", "your"
+}
+
+# Field weights: a match on the tool name counts more than one buried in an example
+FIELD_WEIGHTS = {"name": 3.0, "description": 2.0, "parameters": 1.0, "examples": 0.5}
+
+def _stem(token: str) -> str:
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, crudely stemmed word tokens without stopwords"""
+    return [_stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def _tool_fields(metadata: "ToolMetadata") -> Dict[str, str]:
+    parameters = " ".join(
+        f"{name} {spec.get('description', '') if isinstance(spec, dict) else spec}"
+        for name, spec in metadata.parameters.items()
+    )
+    return {
+        "name": metadata.name.replace("_", " "),
+        "description": metadata.description,
+        "parameters": parameters,
+        "examples": " ".join(metadata.examples)
+    }
+
+class ToolIndex:
+    """Inverted keyword index over tool metadata, ranked with BM25
+
+    Each tool is a document whose terms come from its name, description, parameter
+    names and descriptions, and examples, weighted per field.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._lengths: Dict[str, float] = {}
+
+    def add(self, metadata: "ToolMetadata"):
+        """Index a tool, replacing any earlier entry with the same name"""
+        self.remove(metadata.name)
+        weights: Counter = Counter()
+        for field, text in _tool_fields(metadata).items():
+            for term in tokenize(text):
+                weights[term] += FIELD_WEIGHTS[field]
+
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[metadata.name] = weight
+        self._lengths[metadata.name] = sum(weights.values())
+
+    def remove(self, name: str):
+        if name not in self._lengths:
+            return
+        for term in list(self._postings):
+            self._postings[term].pop(name, None)
+            if not self._postings[term]:
+                del self._postings[term]
+        del self._lengths[name]
+
+    def search(self, query: str, top_k: int = None) -> List[Tuple[str, float]]:
+        """Tool names matching the query as (name, score), best first"""
+        if not self._lengths:
+            return []
+
+        count = len(self._lengths)
+        average_length = sum(self._lengths.values()) / count
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for name, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[name] / average_length)
+                scores[name] = scores.get(name, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k] if top_k else ranked
+
+    def __len__(self) -> int:
+        return len(self._lengths)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Any, List, Tuple
+from app.core.config import settings
+from app.tools.base_tool import BaseTool, ToolMetadata, ToolResult
+from app.utils.chart_renderer import CHART_KINDS, ChartSpec, chart_renderer
+from app.utils.file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+AGGREGATIONS = ("sum", "mean", "median", "count", "min", "max")
+MAX_POINTS = 20_000  # scatter points drawn; larger data is sampled
+
+class VisualizeDataTool(BaseTool):
+    """Plot a column of an uploaded file as a size-capped base64 PNG"""
+
+    cacheable = True
+
+    def _get_metadata(self) -> ToolMetadata:
+        return ToolMetadata(
+            name="visualize_data",
+            description="Create a chart (bar, barh, line, scatter, hist, pie) of a data file and return it as a base64 PNG data URI under a byte limit. Bar, line and pie charts aggregate y per x value; line charts can be cumulative.",
+            parameters={
+                "file_path": {"type": "string", "description": "Path of the data file"},
+                "chart_type": {"type": "string", "enum": list(CHART_KINDS), "description": "Kind of chart"},
+                "x": {"type": "string", "description": "Column for the x axis or categories (not needed for hist)"},
+                "y": {"type": "string", "description": "Numeric column to plot"},
+                "aggregate": {"type": "string", "enum": list(AGGREGATIONS), "description": "How to combine y values per x value (default sum)"},
+                "cumulative": {"type": "boolean", "description": "Plot the running total of y, ordered by x"},
+                "regression": {"type": "boolean", "description": "Scatter only: add a dotted red regression line"},
+                "color": {"type": "string", "description": "Bar, line or marker color, e.g. blue"},
+                "title": {"type": "string", "description": "Chart title"},
+                "max_bytes": {"type": "integer", "description": "Size limit of the base64 data URI (default 100000)"}
+            },
+            required=["file_path", "chart_type", "y"],
+            examples=[
+                '@visualize_data({"chart_type": "bar", "x": "region", "y": "sales", "color": "blue"})',
+                '@visualize_data({"chart_type": "line", "x": "date", "y": "sales", "cumulative": true, "color": "red"})'
+            ]
+        )
+
+    async def execute(self, parameters: Dict[str, Any]) -> ToolResult:
+        if not self.validate_parameters(parameters):
+            return ToolResult(success=False, error=f"Missing required parameters: {self.metadata.required}")
+        try:
+            file_path = parameters["file_path"]
+            df = await FileHandler().load_data_file(file_path, os.path.splitext(file_path)[1][1:].lower())
+            x, y = await asyncio.to_thread(self._series, df, parameters)
+
+            kind = parameters["chart_type"]
+            spec = ChartSpec(
+                kind=kind,
+                x=x,
+                y=y,
+                title=parameters.get("title", ""),
+                xlabel=parameters.get("x", "") if kind != "hist" else parameters["y"],
+                ylabel=parameters["y"] if kind != "hist" else "count",
+                color=parameters.get("color"),
+                regression=bool(parameters.get("regression")),
+                max_bytes=parameters.get("max_bytes") or settings.chart_max_bytes
+            )
+            chart = await chart_renderer.render(spec)
+            return ToolResult(
+                success=True,
+                data={"image": chart.data_uri, "chart_type": kind, "points": len(y)},
+                metadata={"bytes": len(chart.data_uri), "dpi": chart.dpi, "colors": chart.colors, "cached": chart.cached}
+            )
+        except Exception as e:
+            logger.error(f"visualize_data failed: {e}")
+            return ToolResult(success=False, error=str(e))
+
+    def _series(self, df, parameters: Dict[str, Any]) -> Tuple[List[Any], List[float]]:
+        """The x and y values to draw"""
+        import pandas as pd
+        from app.utils.compact import parse_dates
+
+        kind = parameters["chart_type"]
+        if kind not in CHART_KINDS:
+            raise ValueError(f"chart_type must be one of {CHART_KINDS}")
+        y_column = parameters["y"]
+        x_column = parameters.get("x")
+        for column in (x_column, y_column):
+            if column and column not in df.columns:
+                raise ValueError(f"Unknown column '{column}'; columns are {list(df.columns)}")
+        values = pd.to_numeric(df[y_column], errors="coerce")
+
+        if kind == "hist":
+            return [], values.dropna().tolist()
+        if not x_column:
+            raise ValueError(f"'{kind}' charts need an x column")
+
+        keys = df[x_column]
+        if keys.dtype == object or pd.api.types.is_string_dtype(keys):
+            dates = parse_dates(keys)
+            if dates is not None:
+                keys = dates
+        frame = pd.DataFrame({"x": keys, "y": values}).dropna()
+
+        if kind == "scatter":
+            if len(frame) > MAX_POINTS:
+                frame = frame.sample(MAX_POINTS, random_state=0)
+            return frame["x"].tolist(), frame["y"].tolist()
+
+        aggregate = parameters.get("aggregate") or "sum"
+        if aggregate not in AGGREGATIONS:
+            raise ValueError(f"aggregate must be one of {AGGREGATIONS}")
+        grouped = frame.groupby("x", sort=True, observed=True)["y"].agg(aggregate)
+        if parameters.get("cumulative"):
+            grouped = grouped.cumsum()
+        return grouped.index.tolist(), grouped.astype(float).tolist()
@@ -0,0 +1,338 @@
+import io
+import itertools
+import logging
+import math
+import os
+import threading
+from statistics import NormalDist
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+from app.utils.chunked_analysis import MAX_CORRELATION_COLUMNS, _json_number, _normalize_metrics, _order_rows, _python_key
+from app.utils.sketches import HyperLogLog, TDigest
+
+logger = logging.getLogger(__name__)
+
+BACKTRACK_BYTES = 4096
+MAX_SEEKS_PER_ROW = 20  # gives up on rows whose lengths vary wildly
+
+class ScanRateTracker:
+    """Moving estimate of how many bytes per second an exact scan gets through"""
+
+    def __init__(self, bytes_per_second: float = None):
+        self.bytes_per_second = bytes_per_second or settings.scan_bytes_per_second
+        self._lock = threading.Lock()
+
+    def record(self, nbytes: int, seconds: float):
+        if nbytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self.bytes_per_second = 0.8 * self.bytes_per_second + 0.2 * (nbytes / seconds)
+
+    def estimate(self, nbytes: int) -> float:
+        """Expected seconds for an exact scan of nbytes"""
+        return nbytes / self.bytes_per_second
+
+# Global scan rate tracker instance
+scan_rate = ScanRateTracker()
+
+def choose_mode(file_path: str, requested: str = "auto", remaining: Optional[float] = None) -> str:
+    """'exact' or 'approximate' for a data tool call
+
+    In auto mode a file is sampled when an exact scan is expected to take longer than
+    `approximate_budget_share` of the time left before the request's deadline (or of
+    `approximate_latency_budget` when there is none).
+    """
+    if requested in ("exact", "approximate"):
+        return requested
+    if not isinstance(file_path, str) or not file_path.lower().endswith(".csv") or not os.path.isfile(file_path):
+        return "exact"  # only CSVs can be sampled without loading them
+    budget = remaining if remaining is not None else settings.approximate_latency_budget
+    if scan_rate.estimate(os.path.getsize(file_path)) > budget * settings.approximate_budget_share:
+        return "approximate"
+    return "exact"
+
+def random_seek_sample(file_path: str, rows: int, seed: int = None) -> Tuple[pd.DataFrame, float, float]:
+    """Sample about `rows` rows of a CSV, one line per random seek
+
+    Touches only the sampled lines, so the cost does not grow with the file size.
+    A seek lands in a line with probability proportional to its length; lines are
+    kept with probability inversely proportional to their length, so the kept rows
+    are independent uniform draws (with replacement). Files with at most `rows`
+    lines are read whole. Returns the sample, the estimated number of data rows in
+    the file and the standard error of that estimate (0 when read whole).
+    """
+    size = os.path.getsize(file_path)
+    rng = np.random.default_rng(seed)
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        start = f.tell()
+        lines = list(itertools.islice(f, rows + 1))
+        if len(lines) <= rows:
+            sample = _parse_lines(header, lines)
+            return sample, float(len(sample)), 0.0
+
+        # Acceptance bound: lines shorter than every line at the head are always kept
+        shortest = min(len(line) for line in lines)
+        lines = []
+        inverse_lengths: List[float] = []
+        while len(lines) < rows and len(inverse_lengths) < rows * MAX_SEEKS_PER_ROW:
+            for offset in np.sort(rng.integers(start, size, rows - len(lines))):
+                line = _line_at(f, int(offset), start)
+                inverse_lengths.append(1.0 / len(line))
+                if rng.random() * len(line) < shortest:
+                    lines.append(line)
+
+    # A seek lands in a line with probability len / bytes, so E[1 / len] = rows / bytes
+    inverse = np.array(inverse_lengths)
+    estimated_rows = (size - start) * inverse.mean()
+    standard_error = (size - start) * inverse.std(ddof=1) / math.sqrt(inverse.size) if inverse.size > 1 else 0.0
+    return _parse_lines(header, lines), estimated_rows, standard_error
+
+def _line_at(f, offset: int, start: int) -> bytes:
+    """The whole line containing byte `offset`, found by scanning back to its start"""
+    begin = offset
+    while begin > start:
+        step = min(BACKTRACK_BYTES, begin - start)
+        f.seek(begin - step)
+        newline = f.read(step).rfind(b"\n")
+        if newline >= 0:
+            begin = begin - step + newline + 1
+            break
+        begin -= step
+    f.seek(begin)
+    return f.readline()
+
+def _parse_lines(header: bytes, lines: List[bytes]) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(header + b"".join(line if line.endswith(b"\n") else line + b"\n" for line in lines)))
+
+class _Estimator:
+    """Point estimates and confidence intervals from a simple random sample"""
+
+    def __init__(self, population: float, population_error: float, confidence: float, with_replacement: bool = False):
+        self.population = population
+        self.population_error = population_error  # standard error of the population size
+        self.with_replacement = with_replacement
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    def _fpc(self, n: int) -> float:
+        # Finite population correction; 0 when the whole population was sampled
+        if self.with_replacement:
+            return 1.0
+        if n >= self.population:
+            return 0.0
+        if self.population <= 1:
+            return 1.0
+        return math.sqrt((self.population - n) / (self.population - 1))
+
+    def mean(self, values: np.ndarray) -> Tuple[Optional[float], Optional[List[float]]]:
+        n = values.size
+        if not n:
+            return None, None
+        mean = float(values.mean())
+        if n < 2:
+            return mean, None
+        half = self.z * float(values.std(ddof=1)) / math.sqrt(n) * self._fpc(n)
+        return mean, [mean - half, mean + half]
+
+    def share(self, hits: int, n: int) -> Tuple[Optional[float], Optional[List[float]]]:
+        """Estimated number of population rows for a sample proportion hits / n"""
+        if not n:
+            return None, None
+        p = hits / n
+        total = self.population * p
+        relative = math.hypot(
+            self.z * math.sqrt(p * (1 - p) / n) * self._fpc(n) / p if p else 0.0,
+            self.z * self.population_error / self.population if self.population else 0.0
+        )
+        return total, [total * (1 - relative), total * (1 + relative)]
+
+    def total(self, values: np.ndarray, count: float, count_interval: Optional[List[float]]) -> Tuple[Optional[float], Optional[List[float]]]:
+        """Population sum as estimated count times sample mean"""
+        mean, mean_interval = self.mean(values)
+        if mean is None:
+            return None, None
+        total = count * mean
+        if mean_interval is None or not total:
+            return total, None
+        relative = math.hypot(
+            (mean_interval[1] - mean) / mean if mean else 0.0,
+            (count_interval[1] - count) / count if count_interval and count else 0.0
+        )
+        half = abs(total) * relative
+        return total, [total - half, total + half]
+
+    def quantile(self, values: np.ndarray, q: float) -> Tuple[Optional[float], Optional[List[float]]]:
+        """Quantile from a t-digest of the sample; interval from order-statistic ranks"""
+        if not values.size:
+            return None, None
+        digest = TDigest()
+        digest.update(values)
+        spread = self.z * math.sqrt(q * (1 - q) / values.size) * self._fpc(values.size)
+        return digest.quantile(q), [digest.quantile(max(q - spread, 0.0)), digest.quantile(min(q + spread, 1.0))]
+
+    def correlation(self, r: float, n: int) -> Optional[List[float]]:
+        if r is None:
+            return None
+        if self._fpc(n) == 0.0:
+            return [r, r]
+        if n <= 3 or abs(r) >= 1:
+            return None
+        center, half = math.atanh(r), self.z / math.sqrt(n - 3) * self._fpc(n)
+        return [math.tanh(center - half), math.tanh(center + half)]
+
+def _rounded(interval: Optional[List[float]]) -> Optional[List[float]]:
+    return None if interval is None else [_json_number(bound) for bound in interval]
+
+class ApproximateAnalyzer:
+    """Describe-style statistics with confidence intervals, computed from a sample
+
+    CSV files are sampled by random seeks, one row per seek, so the cost is
+    independent of the file size. Distinct counts come from a HyperLogLog over
+    the sample and are therefore lower bounds. The result has the
+    same shape as `summarize_frame`; intervals are returned separately.
+    """
+
+    def __init__(self, sample_rows: int = None, confidence: float = None, seed: int = None):
+        self.sample_rows = sample_rows or settings.approximate_sample_rows
+        self.confidence = confidence or settings.approximate_confidence
+        self.seed = seed
+
+    def analyze(
+        self,
+        file_path: str,
+        group_by: Optional[List[str]] = None,
+        metrics: Optional[Dict[str, Union[str, List[str]]]] = None,
+        correlation: bool = True,
+        order_by: str = None,
+        descending: bool = True,
+        limit: int = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(result, metadata with sampling details and confidence intervals)"""
+        metrics = _normalize_metrics(metrics)
+        group_by = list(group_by or [])
+
+        sample, population, population_error = random_seek_sample(file_path, self.sample_rows, self.seed)
+        # A file read whole has no sampling error; otherwise rows are drawn with replacement
+        with_replacement = population_error > 0
+        for column in group_by + list(metrics):
+            if column not in sample.columns:
+                raise ValueError(f"Unknown column '{column}'; columns are {list(sample.columns)}")
+
+        estimator = _Estimator(population, population_error, self.confidence, with_replacement)
+        numeric = [
+            column for column in sample.columns
+            if pd.api.types.is_numeric_dtype(sample[column]) and not pd.api.types.is_bool_dtype(sample[column])
+        ]
+        n = len(sample)
+
+        columns: Dict[str, Any] = {}
+        column_intervals: Dict[str, Any] = {}
+        for column in sample.columns:
+            series = sample[column]
+            present = series.notna().to_numpy()
+            count, count_interval = estimator.share(int(present.sum()), n)
+            stats = {
+                "count": int(round(count)) if count is not None else None,
+                "nulls": int(round(population - count)) if count is not None else None,
+                "distinct": HyperLogLog().update(series).estimate()
+            }
+            intervals = {"count": _rounded(count_interval)}
+            if column in numeric:
+                values = series.to_numpy(dtype=float, na_value=np.nan)[present]
+                mean, mean_interval = estimator.mean(values)
+                median, median_interval = estimator.quantile(values, 0.5)
+                stats.update({
+                    "mean": _json_number(mean),
+                    "std": _json_number(values.std(ddof=1)) if values.size > 1 else None,
+                    "min": _json_number(values.min()) if values.size else None,
+                    "max": _json_number(values.max()) if values.size else None,
+                    "median": _json_number(median)
+                })
+                intervals.update({"mean": _rounded(mean_interval), "median": _rounded(median_interval)})
+            columns[column] = stats
+            column_intervals[column] = {name: bounds for name, bounds in intervals.items() if bounds is not None}
+
+        result: Dict[str, Any] = {"rows": int(round(population)), "columns": columns}
+        metadata: Dict[str, Any] = {
+            "mode": "approximate",
+            "approximate": True,
+            "sampling": "random_seek" if with_replacement else "full",
+            "sample_rows": n,
+            "confidence": self.confidence,
+            "intervals": {
+                "rows": _rounded([population - estimator.z * population_error, population + estimator.z * population_error]),
+                "columns": column_intervals
+            },
+            "notes": "min, max and distinct are of the sample; distinct counts are lower bounds"
+        }
+
+        if group_by:
+            rows, intervals = self._groups(sample, group_by, metrics, estimator)
+            result["group_by"] = group_by
+            result["groups"] = _order_rows(rows, order_by, descending, limit)
+            order = {id(row): i for i, row in enumerate(rows)}
+            metadata["intervals"]["groups"] = [intervals[order[id(row)]] for row in result["groups"]]
+
+        correlation_columns = numeric[:MAX_CORRELATION_COLUMNS] if correlation else []
+        if len(correlation_columns) > 1:
+            matrix = sample[correlation_columns].corr()
+            pairs = sample[correlation_columns].notna().astype(int)
+            support = pairs.T @ pairs
+            result["correlation"] = {
+                a: {b: _json_number(matrix.loc[a, b]) for b in correlation_columns}
+                for a in correlation_columns
+            }
+            metadata["intervals"]["correlation"] = {
+                a: {b: _rounded(estimator.correlation(_json_number(matrix.loc[a, b]), int(support.loc[a, b]))) for b in correlation_columns if b != a}
+                for a in correlation_columns
+            }
+        return result, metadata
+
+    def _groups(
+        self,
+        sample: pd.DataFrame,
+        group_by: List[str],
+        metrics: Dict[str, List[str]],
+        estimator: _Estimator
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        rows, intervals = [], []
+        n = len(sample)
+        for key, frame in sample.groupby(group_by, dropna=False, sort=False, observed=True):
+            keys = key if isinstance(key, tuple) else (key,)
+            row = {column: _python_key(value) for column, value in zip(group_by, keys)}
+            bounds = dict(row)
+
+            # Each group is its own population, of estimated size
+            size, size_interval = estimator.share(len(frame), n)
+            group = _Estimator(
+                size, (size_interval[1] - size) / estimator.z if size_interval else 0.0,
+                self.confidence, estimator.with_replacement
+            )
+
+            if not metrics:
+                row["count"] = int(round(size))
+                bounds["count"] = _rounded(size_interval)
+            for column, functions in metrics.items():
+                series = frame[column]
+                values = pd.to_numeric(series, errors="coerce").dropna().to_numpy(dtype=float)
+                count, count_interval = group.share(int(series.notna().sum()), len(frame))
+                estimates = {
+                    "count": (count, count_interval),
+                    "sum": group.total(values, count, count_interval) if count is not None else (None, None),
+                    "mean": group.mean(values),
+                    "median": group.quantile(values, 0.5),
+                    "min": (values.min() if values.size else None, None),
+                    "max": (values.max() if values.size else None, None),
+                    "std": (values.std(ddof=1) if values.size > 1 else None, None)
+                }
+                for function in functions:
+                    value, interval = estimates[function]
+                    name = f"{column}_{function}"
+                    row[name] = int(round(value)) if function == "count" and value is not None else _json_number(value)
+                    if interval is not None:
+                        bounds[name] = _rounded(interval)
+            rows.append(row)
+            intervals.append(bounds)
+        return rows, intervals
@@ -0,0 +1,249 @@
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import math
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Union
+from pydantic import BaseModel
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHART_KINDS = ("bar", "barh", "line", "scatter", "hist", "pie")
+DATA_URI_PREFIX = "data:image/png;base64,"
+MIN_DPI = 30
+PALETTE_SIZES = (256, 64, 16)
+
+class ChartSpec(BaseModel):
+    """Everything needed to draw a chart; its hash is the render cache key"""
+    kind: str = "bar"
+    x: List[Any] = []
+    y: List[float] = []
+    title: str = ""
+    xlabel: str = ""
+    ylabel: str = ""
+    color: Optional[str] = None
+    width: float = 6.4  # inches
+    height: float = 4.0
+    dpi: int = 100
+    max_bytes: int = 100_000  # limit on the base64 data URI, not the raw PNG
+    regression: bool = False  # scatter only: overlay a least-squares line
+
+class RenderedChart(BaseModel):
+    data_uri: str
+    bytes: int
+    dpi: int
+    colors: Optional[int] = None  # palette size when quantized
+    cached: bool = False
+
+# Per worker thread: figures reused between renders, keyed by size in inches
+_local = threading.local()
+
+def _warm_worker():
+    """Process/thread initializer: load the Agg backend and fonts before the first chart"""
+    import matplotlib
+    matplotlib.use("Agg")
+    _encode(ChartSpec(kind="line", x=[0, 1], y=[0, 1], title="warm-up", xlabel="x", ylabel="y"))
+
+def _figure(spec: ChartSpec, dpi: int):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figures = getattr(_local, "figures", None)
+    if figures is None:
+        figures = _local.figures = {}
+    key = (spec.width, spec.height)
+    figure = figures.get(key)
+    if figure is None:
+        figure = Figure(figsize=key)
+        FigureCanvasAgg(figure)
+        figures[key] = figure
+    figure.clear()
+    figure.set_dpi(dpi)
+    return figure
+
+def _draw(spec: ChartSpec, dpi: int):
+    figure = _figure(spec, dpi)
+    axes = figure.add_subplot(111)
+    color = spec.color or None
+    labels = [str(value) for value in spec.x]
+
+    if spec.kind == "bar":
+        axes.bar(labels, spec.y, color=color)
+    elif spec.kind == "barh":
+        axes.barh(labels, spec.y, color=color)
+    elif spec.kind == "line":
+        axes.plot(spec.x, spec.y, color=color)
+    elif spec.kind == "scatter":
+        axes.scatter(spec.x, spec.y, color=color, s=12)
+        if spec.regression and len(spec.x) > 1:
+            import numpy as np
+            slope, intercept = np.polyfit(np.asarray(spec.x, dtype=float), np.asarray(spec.y, dtype=float), 1)
+            xs = np.array([min(spec.x), max(spec.x)], dtype=float)
+            axes.plot(xs, slope * xs + intercept, color="red", linestyle="--")
+    elif spec.kind == "hist":
+        axes.hist(spec.y, bins="auto", color=color)
+    elif spec.kind == "pie":
+        axes.pie(spec.y, labels=labels)
+    else:
+        raise ValueError(f"Unsupported chart kind '{spec.kind}', expected one of {CHART_KINDS}")
+
+    if spec.title:
+        axes.set_title(spec.title)
+    if spec.xlabel:
+        axes.set_xlabel(spec.xlabel)
+    if spec.ylabel:
+        axes.set_ylabel(spec.ylabel)
+    if spec.kind in ("line", "scatter") and spec.x and hasattr(spec.x[0], "year"):
+        from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+        locator = AutoDateLocator()
+        axes.xaxis.set_major_locator(locator)
+        axes.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    elif spec.kind in ("bar", "line") and len(labels) > 8:
+        axes.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    return figure
+
+def _rasterize(spec: ChartSpec, dpi: int):
+    """Draw the chart and return it as an RGB PIL image"""
+    from PIL import Image
+
+    figure = _draw(spec, dpi)
+    canvas = figure.canvas
+    canvas.draw()
+    image = Image.frombuffer("RGBA", canvas.get_width_height(), canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+    return image.convert("RGB")
+
+def _png(image, colors: Optional[int] = None) -> bytes:
+    from PIL import Image
+
+    if colors is not None:
+        image = image.quantize(colors=colors, method=Image.Quantize.FASTOCTREE)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=6)
+    return buffer.getvalue()
+
+def _encode(spec: ChartSpec) -> Dict[str, Any]:
+    """Render a PNG whose data URI is no longer than spec.max_bytes
+
+    Tries full color, then shrinking palettes at the requested DPI; if nothing fits,
+    lowers the DPI in proportion to how far the smallest attempt overshot and repeats.
+    """
+    budget = (spec.max_bytes - len(DATA_URI_PREFIX)) * 3 // 4
+    dpi = spec.dpi
+    while True:
+        image = _rasterize(spec, dpi)
+        data = _png(image)
+        if len(data) <= budget:
+            return {"png": data, "dpi": dpi, "colors": None}
+        smallest = len(data)
+
+        # A palette rarely saves more than ~4x; past that, go straight to a lower dpi
+        if smallest <= 4 * budget:
+            for colors in PALETTE_SIZES:
+                data = _png(image, colors)
+                if len(data) <= budget:
+                    return {"png": data, "dpi": dpi, "colors": colors}
+                smallest = min(smallest, len(data))
+
+        if dpi <= MIN_DPI:
+            raise ValueError(f"Chart does not fit in {spec.max_bytes} bytes even at {MIN_DPI} dpi")
+        # PNG size grows roughly with pixel count, i.e. with dpi squared
+        dpi = max(MIN_DPI, int(dpi * math.sqrt(budget / smallest) * 0.9))
+
+def _render_in_worker(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return _encode(ChartSpec(**spec))
+
+class ChartRenderer:
+    """Renders charts on a pool of pre-warmed matplotlib Agg workers
+
+    Each worker loads the backend and fonts once and reuses its Figure objects. The
+    encoder searches palette size and DPI so every PNG fits the spec's byte budget,
+    and finished images are memoized by the hash of their spec.
+    """
+
+    def __init__(self, workers: int = None, executor: str = None, cache_max_entries: int = None):
+        self.workers = workers or settings.chart_workers
+        self.executor_kind = executor or settings.chart_executor
+        self.cache_max_entries = cache_max_entries or settings.chart_cache_max_entries
+        self._executor: Optional[Executor] = None
+        self._cache: "OrderedDict[str, RenderedChart]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="chart-worker",
+                    initializer=_warm_worker
+                )
+        return self._executor
+
+    async def start(self):
+        """Start every worker now so no request pays for matplotlib start-up"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, _render_in_worker, ChartSpec(x=[0], y=[0]).dict())
+            for _ in range(self.workers)
+        ])
+        logger.info(f"Started {self.executor_kind} pool for chart rendering ({self.workers} workers)")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def cache_key(self, spec: ChartSpec) -> str:
+        payload = json.dumps(spec.dict(), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def render(self, spec: Union[ChartSpec, Dict[str, Any]]) -> RenderedChart:
+        """PNG data URI for the chart, from the cache when the same spec was rendered before"""
+        if isinstance(spec, dict):
+            spec = ChartSpec(**spec)
+        key = self.cache_key(spec)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return RenderedChart(**{**cached.dict(), "cached": True})
+            self.misses += 1
+
+        loop = asyncio.get_running_loop()
+        encoded = await loop.run_in_executor(self._get_executor(), _render_in_worker, spec.dict())
+        chart = RenderedChart(
+            data_uri=DATA_URI_PREFIX + base64.b64encode(encoded["png"]).decode(),
+            bytes=len(encoded["png"]),
+            dpi=encoded["dpi"],
+            colors=encoded["colors"]
+        )
+
+        with self._lock:
+            self._cache[key] = chart
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+        return chart
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache)}
+
+# Global chart renderer instance
+chart_renderer = ChartRenderer()
@@ -0,0 +1,471 @@
+import io
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+from app.utils.sketches import HyperLogLog, TDigest
+
+logger = logging.getLogger(__name__)
+
+GROUP_METRICS = ("count", "sum", "mean", "min", "max", "std", "median")
+MAX_CORRELATION_COLUMNS = 20
+SAMPLE_ROWS = 10_000
+
+def _json_number(value: Any) -> Any:
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else value
+
+def _python_key(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+def _normalize_metrics(metrics: Optional[Dict[str, Union[str, List[str]]]]) -> Dict[str, List[str]]:
+    normalized = {}
+    for column, functions in (metrics or {}).items():
+        functions = [functions] if isinstance(functions, str) else list(functions)
+        for function in functions:
+            if function not in GROUP_METRICS:
+                raise ValueError(f"Unsupported aggregation '{function}', expected one of {GROUP_METRICS}")
+        normalized[column] = functions
+    return normalized
+
+class _CoMoments:
+    """Pairwise co-moments of k numeric columns, mergeable across chunks (Chan et al.)
+
+    Entry [i, j] covers the rows where both column i and column j are present, which
+    matches the pairwise-complete correlations of `DataFrame.corr`.
+    """
+
+    def __init__(self, k: int):
+        shape = (k, k)
+        self.n = np.zeros(shape)
+        self.mean_x = np.zeros(shape)
+        self.mean_y = np.zeros(shape)
+        self.m2_x = np.zeros(shape)
+        self.m2_y = np.zeros(shape)
+        self.c_xy = np.zeros(shape)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "_CoMoments":
+        k = values.shape[1]
+        moments = cls(k)
+        valid = ~np.isnan(values)
+        if valid.all():
+            # No gaps: every pair shares the same rows, so one matrix product does it
+            means = values.mean(axis=0)
+            centered = values - means
+            products = centered.T @ centered
+            moments.n[:] = len(values)
+            moments.mean_x[:] = means[:, None]
+            moments.mean_y[:] = means[None, :]
+            moments.c_xy = products
+            moments.m2_x[:] = np.diag(products)[:, None]
+            moments.m2_y[:] = np.diag(products)[None, :]
+            return moments
+
+        for i in range(k):
+            for j in range(i, k):
+                both = valid[:, i] & valid[:, j]
+                n = both.sum()
+                if not n:
+                    continue
+                x, y = values[both, i], values[both, j]
+                mx, my = x.mean(), y.mean()
+                dx, dy = x - mx, y - my
+                for a, b, ma, mb, da, db in ((i, j, mx, my, dx, dy), (j, i, my, mx, dy, dx)):
+                    moments.n[a, b] = n
+                    moments.mean_x[a, b], moments.mean_y[a, b] = ma, mb
+                    moments.m2_x[a, b], moments.m2_y[a, b] = da @ da, db @ db
+                    moments.c_xy[a, b] = da @ db
+        return moments
+
+    def merge(self, other: "_CoMoments") -> "_CoMoments":
+        n = self.n + other.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(n > 0, self.n * other.n / n, 0.0)
+            share = np.where(n > 0, other.n / n, 0.0)
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        self.c_xy = self.c_xy + other.c_xy + delta_x * delta_y * weight
+        self.m2_x = self.m2_x + other.m2_x + delta_x ** 2 * weight
+        self.m2_y = self.m2_y + other.m2_y + delta_y ** 2 * weight
+        self.mean_x = self.mean_x + delta_x * share
+        self.mean_y = self.mean_y + delta_y * share
+        self.n = n
+        return self
+
+    def correlation(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.c_xy / np.sqrt(self.m2_x * self.m2_y)
+
+class ChunkSummary:
+    """Single-pass statistics over a stream of DataFrame chunks
+
+    Keeps per-column counts, HyperLogLog distinct counts, Welford moments and
+    t-digests, group-by partial aggregates and pairwise co-moments. Every part merges exactly (or, for the
+    quantile sketches, with bounded error), so summaries of separate chunks or file
+    ranges combine into the summary of the whole file. Memory depends on the number
+    of columns and groups, never on the number of rows.
+    """
+
+    def __init__(
+        self,
+        numeric: List[str],
+        group_by: Optional[List[str]] = None,
+        metrics: Optional[Dict[str, List[str]]] = None,
+        correlation: bool = True
+    ):
+        self.numeric = list(numeric)
+        self.group_by = list(group_by or [])
+        self.metrics = metrics or {}
+        self.correlation_columns = self.numeric[:MAX_CORRELATION_COLUMNS] if correlation else []
+        self.rows = 0
+        self.chunks = 0
+        self.nulls: Optional[pd.Series] = None
+        self.moments: Optional[pd.DataFrame] = None  # index: column; n, mean, m2, min, max
+        self.digests: Dict[str, TDigest] = {column: TDigest() for column in self.numeric}
+        self.distinct: Dict[str, HyperLogLog] = {}
+        self.groups: Optional[pd.DataFrame] = None  # index: group key; (column, stat) columns
+        self.group_digests: Dict[Tuple[Any, str], TDigest] = {}
+        self.co_moments: Optional[_CoMoments] = None
+
+    def update(self, chunk: pd.DataFrame) -> "ChunkSummary":
+        """Fold one chunk into the summary"""
+        nulls = chunk.isna().sum()
+        self.nulls = nulls if self.nulls is None else self.nulls.add(nulls, fill_value=0)
+        for column in chunk.columns:
+            self.distinct.setdefault(column, HyperLogLog()).update(chunk[column])
+        numeric = chunk[self.numeric].apply(pd.to_numeric, errors="coerce") if self.numeric else chunk[[]]
+
+        self.moments = self._merge_moments(self.moments, self._moments(numeric))
+        for column in self.numeric:
+            self.digests[column].update(numeric[column].to_numpy(dtype=float, na_value=np.nan))
+        if self.group_by:
+            self._update_groups(chunk, numeric)
+        if len(self.correlation_columns) > 1:
+            values = numeric[self.correlation_columns].to_numpy(dtype=float, na_value=np.nan)
+            co_moments = _CoMoments.from_values(values)
+            self.co_moments = co_moments if self.co_moments is None else self.co_moments.merge(co_moments)
+
+        self.rows += len(chunk)
+        self.chunks += 1
+        return self
+
+    def merge(self, other: "ChunkSummary") -> "ChunkSummary":
+        """Fold a summary of other chunks into this one"""
+        if other.nulls is not None:
+            self.nulls = other.nulls if self.nulls is None else self.nulls.add(other.nulls, fill_value=0)
+        self.moments = self._merge_moments(self.moments, other.moments)
+        for column, sketch in other.distinct.items():
+            self.distinct.setdefault(column, HyperLogLog()).merge(sketch)
+        for column, digest in other.digests.items():
+            self.digests[column].merge(digest)
+        if other.groups is not None:
+            self.groups = self._combine_groups(other.groups if self.groups is None else pd.concat([self.groups, other.groups]))
+        for key, digest in other.group_digests.items():
+            self.group_digests.setdefault(key, TDigest()).merge(digest)
+        if other.co_moments is not None:
+            self.co_moments = other.co_moments if self.co_moments is None else self.co_moments.merge(other.co_moments)
+        self.rows += other.rows
+        self.chunks += other.chunks
+        return self
+
+    @staticmethod
+    def _moments(numeric: pd.DataFrame) -> pd.DataFrame:
+        n = numeric.count()
+        return pd.DataFrame({
+            "n": n,
+            "mean": numeric.mean(),
+            "m2": (numeric.var(ddof=0) * n).fillna(0.0),
+            "min": numeric.min(),
+            "max": numeric.max()
+        })
+
+    @staticmethod
+    def _merge_moments(a: Optional[pd.DataFrame], b: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        if a is None or b is None:
+            return b if a is None else a
+        n = a["n"] + b["n"]
+        share = (b["n"] / n).fillna(0.0)
+        delta = (b["mean"] - a["mean"]).fillna(0.0)
+        return pd.DataFrame({
+            "n": n,
+            "mean": a["mean"].fillna(b["mean"]) + delta * share,
+            "m2": a["m2"] + b["m2"] + (delta ** 2 * a["n"] * share).fillna(0.0),
+            "min": pd.concat([a["min"], b["min"]], axis=1).min(axis=1),
+            "max": pd.concat([a["max"], b["max"]], axis=1).max(axis=1)
+        })
+
+    def _update_groups(self, chunk: pd.DataFrame, numeric: pd.DataFrame):
+        keys = [chunk[column] for column in self.group_by]
+        partial = {("", "rows"): chunk.groupby(keys, dropna=False, sort=False).size()}
+        for column in self.metrics:
+            values = numeric[column] if column in self.numeric else pd.to_numeric(chunk[column], errors="coerce")
+            grouped = values.groupby(keys, dropna=False, sort=False)
+            n = grouped.count()
+            partial[(column, "n")] = n
+            partial[(column, "sum")] = grouped.sum()
+            partial[(column, "min")] = grouped.min()
+            partial[(column, "max")] = grouped.max()
+            partial[(column, "m2")] = (grouped.var(ddof=0) * n).fillna(0.0)
+            if "median" in self.metrics[column]:
+                for key, group_values in grouped:
+                    key = key if isinstance(key, tuple) else (key,)
+                    digest = self.group_digests.setdefault((key, column), TDigest())
+                    digest.update(group_values.to_numpy(dtype=float, na_value=np.nan))
+        partial = pd.DataFrame(partial)
+        self.groups = self._combine_groups(partial if self.groups is None else pd.concat([self.groups, partial]))
+
+    def _combine_groups(self, stacked: pd.DataFrame) -> pd.DataFrame:
+        """Collapse stacked partial aggregates to one row per group"""
+        levels = list(range(stacked.index.nlevels))
+
+        def by_group(values: pd.Series):
+            return values.groupby(level=levels, dropna=False, sort=False)
+
+        combined = {("", "rows"): by_group(stacked[("", "rows")]).sum()}
+        for column in self.metrics:
+            n, sums, m2 = stacked[(column, "n")], stacked[(column, "sum")], stacked[(column, "m2")]
+            mean = by_group(sums).transform("sum") / by_group(n).transform("sum")
+            combined[(column, "n")] = by_group(n).sum()
+            combined[(column, "sum")] = by_group(sums).sum()
+            combined[(column, "min")] = by_group(stacked[(column, "min")]).min()
+            combined[(column, "max")] = by_group(stacked[(column, "max")]).max()
+            combined[(column, "m2")] = by_group(m2 + (n * (sums / n - mean) ** 2).fillna(0.0)).sum()
+        return pd.DataFrame(combined)
+
+    def result(self, order_by: str = None, descending: bool = True, limit: int = None) -> Dict[str, Any]:
+        """JSON-friendly statistics in the shape returned by `summarize_frame`"""
+        columns: Dict[str, Any] = {}
+        for column, nulls in (self.nulls if self.nulls is not None else pd.Series(dtype=float)).items():
+            stats = {"count": int(self.rows - nulls), "nulls": int(nulls), "distinct": self.distinct[column].estimate()}
+            if column in self.digests:
+                row = self.moments.loc[column]
+                n = row["n"]
+                stats.update({
+                    "mean": _json_number(row["mean"]) if n else None,
+                    "std": _json_number(math.sqrt(row["m2"] / (n - 1))) if n > 1 else None,
+                    "min": _json_number(row["min"]),
+                    "max": _json_number(row["max"]),
+                    "median": self.digests[column].quantile(0.5)
+                })
+            columns[column] = stats
+
+        result: Dict[str, Any] = {"rows": self.rows, "columns": columns}
+        if self.group_by:
+            result["group_by"] = self.group_by
+            result["groups"] = self._group_rows(order_by, descending, limit)
+        if self.co_moments is not None:
+            matrix = self.co_moments.correlation()
+            result["correlation"] = {
+                a: {b: _json_number(matrix[i, j]) for j, b in enumerate(self.correlation_columns)}
+                for i, a in enumerate(self.correlation_columns)
+            }
+        return result
+
+    def _group_rows(self, order_by: Optional[str], descending: bool, limit: Optional[int]) -> List[Dict[str, Any]]:
+        rows = []
+        groups = self.groups if self.groups is not None else pd.DataFrame()
+        for key, stats in groups.iterrows():
+            keys = key if isinstance(key, tuple) else (key,)
+            row = {column: _python_key(value) for column, value in zip(self.group_by, keys)}
+            if not self.metrics:
+                row["count"] = int(stats[("", "rows")])
+            for column, functions in self.metrics.items():
+                n = stats[(column, "n")]
+                values = {
+                    "count": int(n),
+                    "sum": _json_number(stats[(column, "sum")]),
+                    "mean": _json_number(stats[(column, "sum")] / n) if n else None,
+                    "min": _json_number(stats[(column, "min")]),
+                    "max": _json_number(stats[(column, "max")]),
+                    "std": _json_number(math.sqrt(stats[(column, "m2")] / (n - 1))) if n > 1 else None
+                }
+                for function in functions:
+                    if function == "median":
+                        digest = self.group_digests.get((keys, column))
+                        row[f"{column}_median"] = digest.quantile(0.5) if digest is not None else None
+                    else:
+                        row[f"{column}_{function}"] = values[function]
+            rows.append(row)
+        return _order_rows(rows, order_by, descending, limit)
+
+def _order_rows(rows: List[Dict[str, Any]], order_by: Optional[str], descending: bool, limit: Optional[int]) -> List[Dict[str, Any]]:
+    if order_by:
+        present = [row for row in rows if row.get(order_by) is not None]
+        missing = [row for row in rows if row.get(order_by) is None]
+        rows = sorted(present, key=lambda row: row[order_by], reverse=descending) + missing
+    return rows[:limit or settings.query_max_rows]
+
+def summarize_frame(
+    df: pd.DataFrame,
+    group_by: Optional[List[str]] = None,
+    metrics: Optional[Dict[str, Union[str, List[str]]]] = None,
+    correlation: bool = True,
+    order_by: str = None,
+    descending: bool = True,
+    limit: int = None
+) -> Dict[str, Any]:
+    """Exact statistics of an in-memory frame, in the same shape as the chunked summary"""
+    metrics = _normalize_metrics(metrics)
+    group_by = list(group_by or [])
+    numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
+
+    columns: Dict[str, Any] = {}
+    for column in df.columns:
+        series = df[column]
+        stats = {"count": int(series.count()), "nulls": int(series.isna().sum()), "distinct": int(series.nunique())}
+        if column in numeric:
+            stats.update({
+                "mean": _json_number(series.mean()),
+                "std": _json_number(series.std()),
+                "min": _json_number(series.min()),
+                "max": _json_number(series.max()),
+                "median": _json_number(series.median())
+            })
+        columns[column] = stats
+    result: Dict[str, Any] = {"rows": len(df), "columns": columns}
+
+    if group_by:
+        grouped = df.groupby(group_by, dropna=False, sort=False, observed=True)
+        if metrics:
+            named = {
+                f"{column}_{function}": (column, function)
+                for column, functions in metrics.items() for function in functions
+            }
+            table = grouped.agg(**named)
+        else:
+            table = grouped.size().to_frame("count")
+        rows = []
+        for key, stats in table.iterrows():
+            keys = key if isinstance(key, tuple) else (key,)
+            row = {column: _python_key(value) for column, value in zip(group_by, keys)}
+            for name, value in stats.items():
+                row[name] = int(value) if name.endswith("count") else _json_number(value)
+            rows.append(row)
+        result["group_by"] = group_by
+        result["groups"] = _order_rows(rows, order_by, descending, limit)
+
+    correlation_columns = numeric[:MAX_CORRELATION_COLUMNS] if correlation else []
+    if len(correlation_columns) > 1:
+        matrix = df[correlation_columns].corr()
+        result["correlation"] = {
+            a: {b: _json_number(matrix.loc[a, b]) for b in correlation_columns}
+            for a in correlation_columns
+        }
+    return result
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file, for pd.read_csv"""
+
+    def __init__(self, path: str, start: int, end: int):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+def _summarize_range(path: str, start: int, end: int, options: Dict[str, Any]) -> ChunkSummary:
+    """Process-pool entry point: summarize the CSV rows stored in bytes [start, end)"""
+    summary = ChunkSummary(options["numeric"], options["group_by"], options["metrics"], options["correlation"])
+    with io.BufferedReader(_ByteRange(path, start, end)) as source:
+        for chunk in pd.read_csv(source, header=None, names=options["names"], chunksize=options["chunk_rows"], **options["read_kwargs"]):
+            summary.update(chunk)
+    return summary
+
+class ChunkedCSVAnalyzer:
+    """Describe-style statistics, group-by aggregates, medians and correlations of a
+    CSV file in one streaming pass
+
+    The file is read `chunk_rows` rows at a time into a `ChunkSummary`, so memory
+    stays bounded however large the file is. With `workers` > 1 the file is split
+    at line boundaries into byte ranges that are summarized in separate processes
+    and merged; this assumes no quoted field contains a newline.
+    """
+
+    def __init__(self, chunk_rows: int = None, workers: int = None):
+        self.chunk_rows = chunk_rows or settings.chunked_analysis_chunk_rows
+        self.workers = workers or settings.chunked_analysis_workers
+
+    def analyze(
+        self,
+        file_path: str,
+        group_by: Optional[List[str]] = None,
+        metrics: Optional[Dict[str, Union[str, List[str]]]] = None,
+        correlation: bool = True,
+        order_by: str = None,
+        descending: bool = True,
+        limit: int = None
+    ) -> Dict[str, Any]:
+        metrics = _normalize_metrics(metrics)
+        group_by = list(group_by or [])
+        sample = pd.read_csv(file_path, nrows=SAMPLE_ROWS)
+        for column in group_by + list(metrics):
+            if column not in sample.columns:
+                raise ValueError(f"Unknown column '{column}'; columns are {list(sample.columns)}")
+
+        options = {
+            "names": list(sample.columns),
+            "numeric": [
+                column for column in sample.columns
+                if pd.api.types.is_numeric_dtype(sample[column]) and not pd.api.types.is_bool_dtype(sample[column])
+                and column not in group_by
+            ],
+            "group_by": group_by,
+            "metrics": metrics,
+            "correlation": correlation,
+            "chunk_rows": self.chunk_rows,
+            # Keys are read as text so every chunk agrees on their type
+            "read_kwargs": {"dtype": {column: str for column in group_by}}
+        }
+
+        ranges = self._split(file_path, self.workers)
+        if len(ranges) > 1:
+            with ProcessPoolExecutor(max_workers=len(ranges), mp_context=multiprocessing.get_context("spawn")) as pool:
+                parts = list(pool.map(_summarize_range, *zip(*[(file_path, start, end, options) for start, end in ranges])))
+        else:
+            parts = [_summarize_range(file_path, *ranges[0], options)]
+
+        summary = parts[0]
+        for part in parts[1:]:
+            summary.merge(part)
+        result = summary.result(order_by, descending, limit)
+        result["chunks"] = summary.chunks
+        return result
+
+    def _split(self, file_path: str, parts: int) -> List[Tuple[int, int]]:
+        """Byte ranges of the data rows (after the header), cut at line boundaries"""
+        size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            f.readline()
+            start = f.tell()
+            bounds = [start]
+            for i in range(1, max(parts, 1)):
+                f.seek(max(start + (size - start) * i // parts - 1, bounds[-1]))
+                f.readline()
+                position = f.tell()
+                if bounds[-1] < position < size:
+                    bounds.append(position)
+        bounds.append(size)
+        return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a] or [(start, size)]
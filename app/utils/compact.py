@@ -0,0 +1,99 @@
+import logging
+import warnings
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+def parse_dates(series: "pd.Series", min_valid: float = 0.9) -> Optional["pd.Series"]:
+    """Parse a text column as dates when nearly all sampled values are dates, else None"""
+    import pandas as pd
+
+    sample = series.dropna().head(100)
+    if sample.empty:
+        return None
+
+    # ISO dates parse fast and without pandas' format-inference warning
+    for kwargs in ({"format": "ISO8601"}, {}):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                parsed = pd.to_datetime(sample, errors="coerce", **kwargs)
+            except (ValueError, TypeError):
+                continue
+            if parsed.notna().mean() >= min_valid:
+                return pd.to_datetime(series, errors="coerce", **kwargs)
+    return None
+
+def load_profile() -> str:
+    """Name of the dtype profile frames are loaded with; part of dataset cache keys"""
+    if not settings.compact_dtypes:
+        return "default"
+    # Bumped when the compaction rules change, so frames cached under old rules go stale
+    return "compact2-arrow" if settings.compact_arrow_dtypes else "compact2"
+
+def compact_frame(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Shrink a freshly parsed frame in place of pandas' default dtypes
+
+    64-bit integers that fit become int32 (narrower types overflow too easily in
+    later arithmetic), text columns whose every value is a date become datetimes (so dates are parsed once, at load), and text with
+    few distinct values becomes categorical. Floats keep full precision unless
+    `compact_downcast_floats` is set. With `compact_arrow_dtypes` the remaining
+    columns are converted to Arrow-backed dtypes.
+    """
+    import pandas as pd
+
+    if not settings.compact_dtypes:
+        return df
+    before = int(df.memory_usage(deep=True).sum())
+    columns: Dict[Any, pd.Series] = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            columns[column] = series
+        elif pd.api.types.is_integer_dtype(series):
+            columns[column] = _compact_integers(series)
+        elif pd.api.types.is_float_dtype(series):
+            columns[column] = pd.to_numeric(series, downcast="float") if settings.compact_downcast_floats else series
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            columns[column] = _compact_text(series)
+        else:
+            columns[column] = series
+    compacted = pd.DataFrame(columns, index=df.index)
+
+    if settings.compact_arrow_dtypes:
+        try:
+            others = [c for c in compacted.columns if not isinstance(compacted[c].dtype, pd.CategoricalDtype)]
+            compacted[others] = compacted[others].convert_dtypes(dtype_backend="pyarrow")
+        except (ImportError, TypeError, ValueError) as e:
+            logger.debug(f"Keeping NumPy dtypes: {e}")
+
+    after = int(compacted.memory_usage(deep=True).sum())
+    logger.debug(f"Compacted frame from {before} to {after} bytes")
+    return compacted
+
+def _compact_integers(series: "pd.Series") -> "pd.Series":
+    import numpy as np
+
+    if series.dtype.itemsize <= 4 or series.empty:
+        return series
+    limits = np.iinfo(np.int32)
+    if limits.min <= series.min() and series.max() <= limits.max:
+        return series.astype(np.int32)
+    return series
+
+def _compact_text(series: "pd.Series") -> "pd.Series":
+    dates = parse_dates(series)
+    # Only convert when nothing is lost; stray non-dates would otherwise become NaT
+    if dates is not None and dates.isna().sum() == series.isna().sum():
+        return dates
+    non_null = series.count()
+    if non_null and series.nunique() <= non_null * settings.compact_category_max_ratio:
+        try:
+            return series.astype("category")
+        except TypeError:
+            return series  # unhashable values, e.g. lists from JSON
+    return series
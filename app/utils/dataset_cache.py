@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple, TYPE_CHECKING
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class DatasetCache:
+    """Content-addressed cache of parsed DataFrames
+
+    Frames are kept in memory under a byte budget with LRU eviction and written
+    through to Parquet files in `spill_dir`, so a dataset with the same content
+    hash is parsed once even after it falls out of memory. The spill directory
+    is capped at `max_disk_bytes`, deleting the least recently used files first. Cached frames are
+    shared: callers receive shallow copies and must not mutate them in place.
+    """
+
+    def __init__(self, max_bytes: int = None, spill_dir: str = None, max_disk_bytes: int = None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.dataset_cache_max_bytes
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else settings.dataset_cache_disk_max_bytes
+        self.spill_dir = Path(spill_dir or settings.dataset_cache_dir)
+        self._frames: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # key -> [lock, number of threads using it]; dropped when the last one is done
+        self._key_locks: Dict[str, List[Any]] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def get_or_load(self, key: str, loader: Callable[[], "pd.DataFrame"]) -> "pd.DataFrame":
+        """Return the cached frame for key, parsing it with loader only on a miss"""
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+
+        # Concurrent requests for the same content wait for a single parse
+        try:
+            with key_lock[0]:
+                frame = self._get_memory(key)
+                if frame is not None:
+                    self._touch(key)
+                    return frame.copy(deep=False)
+
+                frame = self._get_disk(key)
+                if frame is None:
+                    with self._lock:
+                        self.misses += 1
+                    frame = loader()
+                    self._spill(key, frame)
+
+                self._put_memory(key, frame)
+                return frame.copy(deep=False)
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+
+    def _get_memory(self, key: str) -> Optional["pd.DataFrame"]:
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _get_disk(self, key: str) -> Optional["pd.DataFrame"]:
+        path = self._spill_path(key)
+        if not path.exists():
+            return None
+        try:
+            import pandas as pd
+            frame = pd.read_parquet(path)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable dataset cache file {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self._touch(key)
+        return frame
+
+    def _put_memory(self, key: str, frame: "pd.DataFrame"):
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._frames:
+                return
+            self._frames[key] = (frame, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._frames:
+                _, (_, evicted_bytes) = self._frames.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def _spill(self, key: str, frame: "pd.DataFrame"):
+        if not settings.dataset_cache_spill:
+            return
+        path = self._spill_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            frame.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # Mixed-type object columns can't always be written as Parquet
+            logger.debug(f"Skipping dataset cache spill for {key}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._trim_disk()
+
+    def _touch(self, key: str):
+        """Mark a spilled file as recently used; disk eviction goes by mtime"""
+        try:
+            os.utime(self._spill_path(key))
+        except OSError:
+            pass
+
+    def _trim_disk(self):
+        """Delete least recently used spill files until the directory fits max_disk_bytes"""
+        files = []
+        for path in self.spill_dir.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # removed by another process
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.disk_evictions += 1
+
+    def _spill_path(self, key: str) -> Path:
+        return self.spill_dir / f"{key}.parquet"
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "entries": len(self._frames),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
+
+# Global dataset cache instance
+dataset_cache = DatasetCache()
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from pydantic import BaseModel
+from app.core.config import settings
+from app.utils.compact import compact_frame, load_profile
+from app.utils.fingerprint import fingerprint_file
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MAX_COLUMNS = 50
+PROFILE_MAX_VALUES = 8
+PROFILE_MAX_TEXT = 40
+PROFILE_MEMORY_ENTRIES = 1024
+
+class ColumnProfile(BaseModel):
+    name: str
+    dtype: str
+    nulls: int = 0
+    distinct: Optional[int] = None
+    min: Optional[Any] = None
+    max: Optional[Any] = None
+    values: List[Any] = []  # most frequent values of low-cardinality columns
+
+class DatasetProfile(BaseModel):
+    rows: int
+    columns: List[ColumnProfile]
+    sample: List[Dict[str, Any]] = []
+    approximate: bool = False  # built from a sample of a file too large to load
+
+    def to_prompt(self, file_name: str) -> str:
+        """Compact text form for the planning prompt"""
+        rows = f"~{self.rows}" if self.approximate else str(self.rows)
+        lines = [f"Profile of {file_name} ({rows} rows, {len(self.columns)} columns):"]
+        for column in self.columns[:PROFILE_MAX_COLUMNS]:
+            details = []
+            if column.values:
+                more = ", ..." if column.distinct and column.distinct > len(column.values) else ""
+                details.append(f"{column.distinct} distinct: {', '.join(str(v) for v in column.values)}{more}")
+            elif column.distinct is not None:
+                details.append(f"{column.distinct} distinct")
+            if column.min is not None:
+                details.append(f"{column.min} to {column.max}")
+            if column.nulls:
+                details.append(f"{column.nulls} nulls")
+            lines.append(f"- {column.name}: {column.dtype}" + (f" ({'; '.join(details)})" if details else ""))
+        if len(self.columns) > PROFILE_MAX_COLUMNS:
+            lines.append(f"- ... {len(self.columns) - PROFILE_MAX_COLUMNS} more columns")
+        if self.sample:
+            lines.append("Sample rows:")
+            lines.extend(json.dumps(row, separators=(',', ':'), default=str) for row in self.sample)
+        if self.approximate:
+            lines.append("(estimated from a sample; distinct counts and ranges cover only the sample)")
+        return "\n".join(lines)
+
+def profile_frame(df: "pd.DataFrame", sample_rows: int = None) -> DatasetProfile:
+    """Profile an in-memory frame: dtypes, null and distinct counts, ranges and sample rows"""
+    import pandas as pd
+
+    sample_rows = settings.dataset_profile_sample_rows if sample_rows is None else sample_rows
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        column = ColumnProfile(name=str(name), dtype=str(series.dtype), nulls=int(series.isna().sum()))
+        try:
+            column.distinct = int(series.nunique())
+        except TypeError:
+            pass  # unhashable values, e.g. lists from JSON
+        if (column.distinct is not None and column.distinct <= PROFILE_MAX_VALUES) or isinstance(series.dtype, pd.CategoricalDtype):
+            counts = series.value_counts().head(PROFILE_MAX_VALUES)
+            column.values = [_json_value(value) for value in counts.index if counts[value] > 0]
+        if column.distinct and not pd.api.types.is_bool_dtype(series) and (
+            pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)
+        ):
+            column.min, column.max = _json_value(series.min()), _json_value(series.max())
+        columns.append(column)
+
+    sample = json.loads(df.head(sample_rows).to_json(orient="records", date_format="iso", default_handler=str))
+    for row in sample:
+        for key, value in row.items():
+            if isinstance(value, str) and len(value) > PROFILE_MAX_TEXT:
+                row[key] = value[:PROFILE_MAX_TEXT] + "..."
+    return DatasetProfile(rows=len(df), columns=columns, sample=sample)
+
+def _json_value(value: Any) -> Any:
+    """Plain JSON value for a numpy/pandas scalar"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 6)
+    return value if isinstance(value, (int, str, bool)) or value is None else str(value)
+
+class DatasetProfiler:
+    """Builds a profile of each uploaded data file once, keyed by its content hash
+
+    Profiling starts in the background as soon as a file is uploaded, so it usually
+    finishes while the request is still being parsed. Profiles are kept in memory
+    and written as JSON to `profile_dir`, so re-uploads of the same content are
+    free. Files loaded whole go through the dataset cache, which the later tool
+    calls then hit; CSVs too large to load are profiled from a random-seek sample.
+    """
+
+    def __init__(self, profile_dir: str = None):
+        self.profile_dir = Path(profile_dir or settings.dataset_profile_dir)
+        self._profiles: "OrderedDict[str, DatasetProfile]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def start(self, file_path: str, file_name: str) -> Optional[asyncio.Task]:
+        """Begin profiling a file in the background; must be called on the event loop"""
+        if not settings.dataset_profile_enabled:
+            return None
+        task = self._pending.get(file_path)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(
+                asyncio.to_thread(self.build, file_path, _file_type(file_name))
+            )
+            self._pending[file_path] = task
+            task.add_done_callback(lambda _: self._pending.pop(file_path, None))
+        return task
+
+    async def get(self, file_path: str, file_name: str) -> Optional[DatasetProfile]:
+        """Profile of a file, waiting for an in-flight build; None if it cannot be profiled"""
+        task = self.start(file_path, file_name)
+        if task is None:
+            return None
+        # Shielded so a caller's timeout leaves the build running for the next request
+        return await asyncio.shield(task)
+
+    def build(self, file_path: str, file_type: str) -> Optional[DatasetProfile]:
+        """Blocking: return the cached profile or compute it"""
+        try:
+            key = f"{fingerprint_file(file_path)}-{file_type}-{load_profile()}"
+            profile = self._get_memory(key) or self._get_disk(key)
+            if profile is None:
+                with self._lock:
+                    self.misses += 1
+                profile = self._compute(file_path, file_type)
+                self._save(key, profile)
+            self._put_memory(key, profile)
+            return profile
+        except Exception as e:
+            logger.warning(f"Could not profile {os.path.basename(file_path)}: {e}")
+            return None
+
+    def _compute(self, file_path: str, file_type: str) -> DatasetProfile:
+        from app.utils.file_handler import FileHandler
+
+        file_handler = FileHandler()
+        if not file_handler.needs_chunked_analysis(file_path, file_type):
+            return profile_frame(file_handler.load_data_file_sync(file_path, file_type))
+
+        from app.utils.approximate import random_seek_sample
+
+        sample, estimated_rows, _ = random_seek_sample(file_path, settings.approximate_sample_rows)
+        profile = profile_frame(compact_frame(sample))
+        share = estimated_rows / len(sample) if len(sample) else 0.0
+        for column in profile.columns:
+            column.nulls = round(column.nulls * share)
+        profile.rows = round(estimated_rows)
+        profile.approximate = True
+        return profile
+
+    def _get_memory(self, key: str) -> Optional[DatasetProfile]:
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                self.hits += 1
+            return profile
+
+    def _put_memory(self, key: str, profile: DatasetProfile):
+        with self._lock:
+            self._profiles[key] = profile
+            self._profiles.move_to_end(key)
+            while len(self._profiles) > PROFILE_MEMORY_ENTRIES:
+                self._profiles.popitem(last=False)
+
+    def _get_disk(self, key: str) -> Optional[DatasetProfile]:
+        path = self.profile_dir / f"{key}.json"
+        if not path.exists():
+            return None
+        try:
+            profile = DatasetProfile(**json.loads(path.read_text()))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable profile {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        return profile
+
+    def _save(self, key: str, profile: DatasetProfile):
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            path = self.profile_dir / f"{key}.json"
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(profile.dict(), default=str))
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write profile for {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._profiles),
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+def _file_type(file_name: str) -> str:
+    return os.path.splitext(file_name)[1][1:].lower()
+
+dataset_profiler = DatasetProfiler()
@@ -1,63 +1,154 @@
+import asyncio
+import hashlib
+import io
+import shutil
 import tempfile
 import os
 import aiofiles
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union, TYPE_CHECKING
 import logging
 from fastapi import UploadFile
-import pandas as pd
 import json
+from app.core.config import settings
+from app.utils.compact import compact_frame, load_profile
+from app.utils.dataset_cache import dataset_cache
+from app.utils.dataset_profile import dataset_profiler
+from app.utils.fingerprint import fingerprint_bytes, fingerprint_file, remember_fingerprint
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+PROFILED_EXTENSIONS = ('.csv', '.xlsx', '.json', '.parquet')
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limits"""
+    pass
+
+class DataFileTooLargeError(ValueError):
+    """Raised instead of loading a CSV too large to hold in memory"""
+    pass
+
 class FileHandler:
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
+        self.spool_dir: Optional[str] = None
+        self.file_hashes: Dict[str, str] = {}
+        self._spooled_bytes = 0
         
     async def process_uploads(self, files: List[UploadFile]) -> Dict[str, Any]:
-        """Process uploaded files and return processed data"""
+        """Process uploaded files, returning questions.txt as text and other files as spooled paths"""
         processed_files = {}
         
         for file in files:
             if file.filename == "questions.txt":
-                content = await file.read()
+                content = await file.read(settings.max_upload_bytes + 1)
+                if len(content) > settings.max_upload_bytes:
+                    raise UploadTooLargeError("questions.txt exceeds the upload size limit")
                 processed_files["questions.txt"] = content.decode('utf-8')
             else:
-                # Process other files based on extension
-                content = await file.read()
-                extension = file.filename.split('.')[-1].lower()
-                
-                if extension in ['csv', 'xlsx', 'json', 'parquet']:
-                    processed_files[file.filename] = content
-                else:
-                    processed_files[file.filename] = content
+                # Stream other files to disk; tools receive the path
+                processed_files[file.filename] = await self.save_temp_file(file)
+                if file.filename.lower().endswith(PROFILED_EXTENSIONS):
+                    # Profile while the rest of the request is read and parsed
+                    dataset_profiler.start(processed_files[file.filename], file.filename)
         
         return processed_files
     
+    def get_spool_dir(self) -> str:
+        """Per-request directory that uploads are spooled into"""
+        if self.spool_dir is None:
+            spool_root = settings.upload_spool_dir or None
+            if spool_root:
+                os.makedirs(spool_root, exist_ok=True)
+            self.spool_dir = tempfile.mkdtemp(prefix="upload-", dir=spool_root)
+        return self.spool_dir
+    
     async def save_temp_file(self, file: UploadFile) -> str:
-        """Save uploaded file to temporary location"""
-        temp_path = os.path.join(self.temp_dir, file.filename)
-        async with aiofiles.open(temp_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        """Stream an upload chunk by chunk into the request spool directory, hashing as it goes"""
+        filename = os.path.basename(file.filename or "") or "upload"
+        temp_path = os.path.join(self.get_spool_dir(), filename)
+        digest = hashlib.sha256()
+        size = 0
+        
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    self._spooled_bytes += len(chunk)
+                    if size > settings.max_upload_bytes:
+                        raise UploadTooLargeError(
+                            f"{filename} exceeds the {settings.max_upload_bytes} byte upload limit"
+                        )
+                    if self._spooled_bytes > settings.max_request_upload_bytes:
+                        raise UploadTooLargeError(
+                            f"Uploads exceed the {settings.max_request_upload_bytes} byte request limit"
+                        )
+                    digest.update(chunk)
+                    await f.write(chunk)
+        except Exception:
+            self.cleanup_temp_files([temp_path])
+            raise
+        
+        self.file_hashes[filename] = digest.hexdigest()
+        remember_fingerprint(temp_path, self.file_hashes[filename])
         return temp_path
     
-    async def load_data_file(self, file_path: str, file_type: str) -> pd.DataFrame:
-        """Load data from file based on type"""
+    @staticmethod
+    def needs_chunked_analysis(file_path: Union[str, bytes], file_type: str) -> bool:
+        """Whether a CSV is too large to load whole and must be analyzed in chunks"""
+        return (
+            file_type == 'csv'
+            and isinstance(file_path, str)
+            and os.path.getsize(file_path) > settings.chunked_analysis_threshold_bytes
+        )
+    
+    async def load_data_file(self, file_path: Union[str, bytes], file_type: str) -> "pd.DataFrame":
+        """Load data from a file path or raw upload content, parsing each distinct content once"""
         try:
-            if file_type == 'csv':
-                return pd.read_csv(file_path)
-            elif file_type == 'xlsx':
-                return pd.read_excel(file_path)
-            elif file_type == 'json':
-                return pd.read_json(file_path)
-            elif file_type == 'parquet':
-                return pd.read_parquet(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+            return await asyncio.to_thread(self.load_data_file_sync, file_path, file_type)
         except Exception as e:
             logger.error(f"Error loading data file: {str(e)}")
             raise
     
+    def load_data_file_sync(self, file_path: Union[str, bytes], file_type: str) -> "pd.DataFrame":
+        """Blocking form of load_data_file, for code already running off the event loop"""
+        if self.needs_chunked_analysis(file_path, file_type):
+            raise DataFileTooLargeError(
+                f"{os.path.basename(file_path)} is larger than {settings.chunked_analysis_threshold_bytes} bytes; "
+                "use describe_data or analyze_data, which stream it instead of loading it"
+            )
+        
+        if isinstance(file_path, bytes):
+            content_hash = fingerprint_bytes(file_path)
+        else:
+            content_hash = fingerprint_file(file_path)
+        return dataset_cache.get_or_load(
+            f"{content_hash}-{file_type}-{load_profile()}",
+            lambda: compact_frame(self._parse_data_file(file_path, file_type))
+        )
+    
+    def _parse_data_file(self, file_path: Union[str, bytes], file_type: str) -> "pd.DataFrame":
+        """Parse data from file based on type"""
+        import pandas as pd
+        
+        source = io.BytesIO(file_path) if isinstance(file_path, bytes) else file_path
+        if file_type == 'csv':
+            return pd.read_csv(source)
+        elif file_type == 'xlsx':
+            return pd.read_excel(source)
+        elif file_type == 'json':
+            return pd.read_json(source)
+        elif file_type == 'parquet':
+            return pd.read_parquet(source)
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+    
     def cleanup_temp_files(self, file_paths: List[str]) -> None:
         """Clean up temporary files"""
         for file_path in file_paths:
@@ -66,3 +157,9 @@ class FileHandler:
                     os.remove(file_path)
             except Exception as e:
                 logger.warning(f"Failed to cleanup temp file {file_path}: {str(e)}")
+    
+    def cleanup(self) -> None:
+        """Remove the request spool directory and everything in it"""
+        if self.spool_dir is not None:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            self.spool_dir = None
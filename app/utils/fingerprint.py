@@ -0,0 +1,41 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Content hashes memoized by (path, size, mtime) so unchanged files are hashed once
+_fingerprints: Dict[Tuple[str, int, int], str] = {}
+_fingerprint_lock = threading.Lock()
+
+def fingerprint_bytes(content: bytes) -> str:
+    """SHA-256 of in-memory content"""
+    return hashlib.sha256(content).hexdigest()
+
+def _fingerprint_key(file_path: str) -> Tuple[str, int, int]:
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+def remember_fingerprint(file_path: str, content_hash: str):
+    """Record a hash computed elsewhere (e.g. while streaming an upload to disk)"""
+    key = _fingerprint_key(file_path)
+    with _fingerprint_lock:
+        _fingerprints[key] = content_hash
+
+def fingerprint_file(file_path: str) -> str:
+    """SHA-256 of a file's content, memoized while the file is unchanged"""
+    key = _fingerprint_key(file_path)
+    with _fingerprint_lock:
+        cached = _fingerprints.get(key)
+    if cached:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    with _fingerprint_lock:
+        _fingerprints[key] = digest.hexdigest()
+    return _fingerprints[key]
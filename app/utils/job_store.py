@@ -0,0 +1,233 @@
+import base64
+import binascii
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_KEY = "$artifact"
+ARTIFACT_REF_PREFIX = "artifact:"
+IMAGE_PREFIXES = {"data:image/png;base64,": "png", "data:image/jpeg;base64,": "jpg", "data:image/webp;base64,": "webp"}
+MIN_ARTIFACT_CHARS = 1024
+
+def _split_image(value: str) -> Optional[Tuple[str, str, str]]:
+    """(data URI prefix, extension, base64 payload) for an inline image string"""
+    if len(value) < MIN_ARTIFACT_CHARS:
+        return None
+    for prefix, extension in IMAGE_PREFIXES.items():
+        if value.startswith(prefix):
+            return prefix, extension, value[len(prefix):]
+    if value.startswith("iVBORw0KGgo"):  # bare base64 PNG
+        return "", "png", value
+    return None
+
+class JobStore:
+    """Persistent store of analysis jobs: status rows in SQLite, results as files
+
+    Each job has a directory under `root` holding `result.json`. Inline base64
+    images in the result are written next to it as artifact files and replaced by
+    references, which `load_result` inlines again or returns as `artifact:<name>`.
+    Jobs expire `ttl_seconds` after they finish and `evict_expired` deletes them.
+
+    Several API processes may share one store. Each unfinished job is owned by the
+    worker that accepted it and holds a lease the owner renews with `renew_leases`;
+    only jobs whose lease ran out are treated as abandoned.
+    """
+
+    def __init__(self, root: str = None, ttl_seconds: float = None, worker_id: str = None, lease_seconds: float = None):
+        self.root = Path(root or settings.job_store_dir)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.job_ttl_seconds
+        self.worker_id = worker_id or settings.job_worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds or settings.job_lease_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.root / "jobs.sqlite"), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    expires REAL,
+                    error TEXT,
+                    owner TEXT,
+                    lease REAL
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql_type in (("owner", "TEXT"), ("lease", "REAL")):
+                if column not in columns:  # stores created before leases existed
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires)")
+            self._conn.commit()
+        return self._conn
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def create(self) -> str:
+        """Record a new queued job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO jobs (id, status, created, updated, owner, lease) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, now, now, self.worker_id, now + self.lease_seconds)
+            )
+            conn.commit()
+        return job_id
+
+    def set_status(self, job_id: str, status: str, error: str = None):
+        now = time.time()
+        expires = now + self.ttl_seconds if status in ("succeeded", "failed") else None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated = ?, expires = ?, error = ? WHERE id = ?",
+                (status, now, expires, error, job_id)
+            )
+            conn.commit()
+
+    def save_result(self, job_id: str, result: Dict[str, Any]):
+        """Write the result and its image artifacts, then mark the job succeeded"""
+        job_dir = self.job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        artifacts: List[str] = []
+        stored = self._extract_artifacts(result, job_dir, artifacts)
+
+        tmp_path = job_dir / "result.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stored, f, default=str)
+        os.replace(tmp_path, job_dir / "result.json")
+        self.set_status(job_id, "succeeded")
+
+    def _extract_artifacts(self, value: Any, job_dir: Path, artifacts: List[str]) -> Any:
+        if isinstance(value, str):
+            image = _split_image(value)
+            if image is None:
+                return value
+            prefix, extension, payload = image
+            try:
+                data = base64.b64decode(payload, validate=True)
+            except (binascii.Error, ValueError):
+                return value
+            name = f"artifact_{len(artifacts)}.{extension}"
+            (job_dir / name).write_bytes(data)
+            artifacts.append(name)
+            return {ARTIFACT_KEY: name, "prefix": prefix}
+        if isinstance(value, dict):
+            return {key: self._extract_artifacts(item, job_dir, artifacts) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._extract_artifacts(item, job_dir, artifacts) for item in value]
+        return value
+
+    def load_result(self, job_id: str, inline_artifacts: bool = True) -> Optional[Dict[str, Any]]:
+        """The stored result with artifacts inlined again, or as artifact references"""
+        path = self.job_dir(job_id) / "result.json"
+        if not path.exists():
+            return None
+        with open(path) as f:
+            stored = json.load(f)
+        return self._restore_artifacts(stored, self.job_dir(job_id), inline_artifacts)
+
+    def _restore_artifacts(self, value: Any, job_dir: Path, inline: bool) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {ARTIFACT_KEY, "prefix"}:
+                name = value[ARTIFACT_KEY]
+                if not inline:
+                    return f"{ARTIFACT_REF_PREFIX}{name}"
+                return value["prefix"] + base64.b64encode((job_dir / name).read_bytes()).decode()
+            return {key: self._restore_artifacts(item, job_dir, inline) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._restore_artifacts(item, job_dir, inline) for item in value]
+        return value
+
+    def artifact_path(self, job_id: str, name: str) -> Optional[Path]:
+        """Path of a stored artifact, refusing names that escape the job directory"""
+        if os.path.basename(name) != name or not name.startswith("artifact_"):
+            return None
+        path = self.job_dir(job_id) / name
+        return path if path.is_file() else None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status row of a job, or None when unknown or expired"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id, status, created, updated, expires, error FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None or (row[4] is not None and row[4] < time.time()):
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "created": row[2],
+            "updated": row[3],
+            "expires": row[4],
+            "error": row[5]
+        }
+
+    def renew_leases(self) -> int:
+        """Extend the lease of every unfinished job this worker owns"""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "UPDATE jobs SET lease = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                (time.time() + self.lease_seconds, self.worker_id)
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def fail_abandoned(self, reason: str, include_own: bool = False) -> int:
+        """Mark unfinished jobs whose lease ran out as failed
+
+        With `include_own`, jobs recorded under this worker's id are failed too; on
+        startup those can only be left over from a previous run of this worker.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated = ?, expires = ? "
+                "WHERE status IN ('queued', 'running') AND (lease IS NULL OR lease < ? OR (? AND owner = ?))",
+                (reason, now, now + self.ttl_seconds, now, include_own, self.worker_id)
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def evict_expired(self) -> int:
+        """Delete expired jobs and their files"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            expired = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs WHERE expires IS NOT NULL AND expires < ?", (now,)
+            )]
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+            conn.commit()
+        for job_id in expired:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        if expired:
+            logger.info(f"Evicted {len(expired)} expired jobs")
+        return len(expired)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
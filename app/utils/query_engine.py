@@ -0,0 +1,195 @@
+import datetime
+import decimal
+import logging
+import os
+from typing import Dict, Any, List, Optional, Union
+import duckdb
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+VIEW_NAME = "data"
+
+AGGREGATE_FUNCTIONS = {
+    "sum": "SUM",
+    "mean": "AVG",
+    "avg": "AVG",
+    "min": "MIN",
+    "max": "MAX",
+    "count": "COUNT",
+    "nunique": "COUNT(DISTINCT {})",
+    "median": "MEDIAN",
+    "std": "STDDEV_SAMP",
+    "var": "VAR_SAMP"
+}
+
+FILTER_OPERATORS = {"=", "==", "!=", "<>", "<", "<=", ">", ">=", "in", "not in", "like", "is null", "is not null"}
+
+class QueryEngineSandboxError(RuntimeError):
+    """Raised when DuckDB cannot be restricted to the registered file"""
+    pass
+
+def quote_identifier(name: str) -> str:
+    """Quote a column name for use in SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def quote_literal(value: Any) -> str:
+    """Render a Python value as a SQL literal"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time, datetime.timedelta)):
+        return str(value)
+    return value
+
+class QueryEngine:
+    """Runs SQL over uploaded files with DuckDB without loading them into pandas
+
+    Each file is exposed as a view named `data` over DuckDB's native CSV/Parquet/JSON
+    readers, so scans are streamed, multi-threaded and spill to disk when aggregations
+    exceed the memory limit. Only single SELECT statements are accepted and file access
+    is restricted to the registered file.
+    """
+
+    def __init__(self, threads: int = None, memory_limit: str = None):
+        self.threads = threads if threads is not None else settings.duckdb_threads
+        self.memory_limit = memory_limit or settings.duckdb_memory_limit
+
+    def connect(self, file_path: str) -> duckdb.DuckDBPyConnection:
+        """Open an in-memory connection with the file registered as the `data` view"""
+        con = duckdb.connect(database=":memory:")
+        if self.threads:
+            con.execute(f"SET threads = {int(self.threads)}")
+        if self.memory_limit:
+            con.execute(f"SET memory_limit = {quote_literal(self.memory_limit)}")
+        if settings.duckdb_temp_dir:
+            con.execute(f"SET temp_directory = {quote_literal(settings.duckdb_temp_dir)}")
+
+        path = os.path.abspath(file_path)
+        con.execute(f"CREATE VIEW {VIEW_NAME} AS SELECT * FROM {self._reader(path)}")
+
+        try:
+            allowed = [path]
+            if settings.duckdb_temp_dir:
+                allowed.append(os.path.abspath(settings.duckdb_temp_dir))
+            con.execute(f"SET allowed_paths = [{', '.join(quote_literal(p) for p in allowed)}]")
+            con.execute("SET enable_external_access = false")
+            con.execute("SET lock_configuration = true")
+        except duckdb.Error as e:
+            # Without the lockdown, SQL could read any file the server can (fail closed)
+            con.close()
+            logger.error(f"DuckDB file access lockdown failed: {e}")
+            raise QueryEngineSandboxError(f"Query engine unavailable: file access could not be restricted ({e})") from e
+        return con
+
+    def _reader(self, path: str) -> str:
+        extension = path.rsplit('.', 1)[-1].lower()
+        if extension in ('csv', 'tsv', 'txt'):
+            return f"read_csv_auto({quote_literal(path)})"
+        elif extension == 'parquet':
+            return f"read_parquet({quote_literal(path)})"
+        elif extension in ('json', 'jsonl', 'ndjson'):
+            return f"read_json_auto({quote_literal(path)})"
+        else:
+            raise ValueError(f"Unsupported file type for query engine: {extension}")
+
+    def query(self, file_path: str, sql: str, max_rows: int = None) -> Dict[str, Any]:
+        """Run a single SELECT statement against the `data` view"""
+        con = self.connect(file_path)
+        try:
+            statements = con.extract_statements(sql)
+            if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+                raise ValueError("Only a single SELECT statement is allowed")
+            return self._fetch(con.execute(sql), max_rows)
+        finally:
+            con.close()
+
+    def aggregate(
+        self,
+        file_path: str,
+        group_by: Union[str, List[str], None] = None,
+        metrics: Optional[Dict[str, Union[str, List[str]]]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = None
+    ) -> Dict[str, Any]:
+        """Group-by aggregation built from structured parameters"""
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        select = [quote_identifier(column) for column in group_by]
+
+        for column, functions in (metrics or {}).items():
+            for function in ([functions] if isinstance(functions, str) else functions):
+                select.append(f"{self._aggregate_expression(column, function)} AS {quote_identifier(f'{column}_{function}')}")
+        if len(select) == len(group_by):
+            select.append(f"COUNT(*) AS {quote_identifier('count')}")
+
+        sql = f"SELECT {', '.join(select)} FROM {VIEW_NAME}"
+        if filters:
+            sql += " WHERE " + " AND ".join(self._filter_expression(f) for f in filters)
+        if group_by:
+            sql += " GROUP BY " + ", ".join(quote_identifier(column) for column in group_by)
+        if order_by:
+            sql += f" ORDER BY {quote_identifier(order_by)} {'DESC' if descending else 'ASC'}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        con = self.connect(file_path)
+        try:
+            result = self._fetch(con.execute(sql), limit)
+            result["sql"] = sql
+            return result
+        finally:
+            con.close()
+
+    def summarize(self, file_path: str) -> Dict[str, Any]:
+        """Per-column summary statistics (type, min, max, nulls, distinct, quartiles)"""
+        con = self.connect(file_path)
+        try:
+            return self._fetch(con.execute(f"SUMMARIZE {VIEW_NAME}"), None)
+        finally:
+            con.close()
+
+    def _aggregate_expression(self, column: str, function: str) -> str:
+        template = AGGREGATE_FUNCTIONS.get(function.lower())
+        if template is None:
+            raise ValueError(f"Unsupported aggregation: {function}")
+        if "{}" in template:
+            return template.format(quote_identifier(column))
+        return f"{template}({quote_identifier(column)})"
+
+    def _filter_expression(self, condition: Dict[str, Any]) -> str:
+        column = quote_identifier(condition["column"])
+        op = str(condition.get("op", "=")).lower()
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if op in ("is null", "is not null"):
+            return f"{column} {op.upper()}"
+        if op in ("in", "not in"):
+            values = ", ".join(quote_literal(v) for v in condition.get("value", []))
+            return f"{column} {op.upper()} ({values})"
+        return f"{column} {'=' if op == '==' else op.upper()} {quote_literal(condition.get('value'))}"
+
+    def _fetch(self, cursor, max_rows: Optional[int]) -> Dict[str, Any]:
+        """Fetch at most max_rows rows into a compact JSON-friendly result"""
+        max_rows = max_rows or settings.query_max_rows
+        columns = [description[0] for description in cursor.description]
+        rows = cursor.fetchmany(max_rows + 1)
+        truncated = len(rows) > max_rows
+        return {
+            "columns": columns,
+            "rows": [
+                {column: _to_jsonable(value) for column, value in zip(columns, row)}
+                for row in rows[:max_rows]
+            ],
+            "row_count": min(len(rows), max_rows),
+            "truncated": truncated
+        }
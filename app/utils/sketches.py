@@ -0,0 +1,122 @@
+import math
+from typing import Iterable, Optional
+import numpy as np
+from app.core.config import settings
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest with the k1 scale function)
+
+    Values are summarized by at most ~`compression` centroids, dense at the tails and
+    sparse around the median, so memory is bounded regardless of how many values are
+    added. Digests built over separate chunks or processes merge into one with the
+    same accuracy as a digest built over all the values.
+    """
+
+    def __init__(self, compression: int = None):
+        self.compression = compression or settings.tdigest_compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: Iterable[float]):
+        """Add a batch of values; NaNs are ignored"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._absorb(values, np.ones(values.size))
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one"""
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._absorb(other.means, other.weights)
+        return self
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # Centroids whose mid-rank falls in the same unit of k = d/2pi * asin(2q - 1) merge
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        bins = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+        self.count = float(total)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0..1), or None when empty"""
+        if not self.count:
+            return None
+        if self.means.size == 1:
+            return float(self.means[0])
+        centers = np.cumsum(self.weights) - self.weights / 2
+        value = np.interp(
+            q * self.count,
+            np.r_[0.0, centers, self.count],
+            np.r_[self.min, self.means, self.max]
+        )
+        return float(value)
+
+    def __len__(self) -> int:
+        return int(self.means.size)
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch with 2**precision one-byte registers
+
+    The relative standard error of `estimate` is about 1.04 / sqrt(2**precision).
+    """
+
+    def __init__(self, precision: int = None):
+        self.precision = precision or settings.hll_precision
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    def update(self, values) -> "HyperLogLog":
+        """Add a pandas Series (or anything it accepts); nulls are ignored"""
+        import pandas as pd
+
+        series = pd.Series(values).dropna()
+        if series.empty:
+            return self
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+        self.update_hashes(hashes)
+        return self
+
+    def update_hashes(self, hashes: np.ndarray):
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = (hashes << np.uint64(p)) | np.uint64(1 << (p - 1))  # guard bit bounds the rank
+        # Rank = position of the leftmost 1 bit in the remaining 64 - p bits
+        rank = (64 - np.floor(np.log2(rest.astype(np.float64))).astype(np.int64)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.registers.size)
+
+    def estimate(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))  # linear counting for small cardinalities
+        return int(round(raw))
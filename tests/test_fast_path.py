@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.agents.fast_path import FastPathMatcher
+from app.utils.compact import compact_frame
+
+SAMPLE_SALES = Path(__file__).resolve().parent.parent / "sample-sales.csv"
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return FastPathMatcher(compact_frame(pd.read_csv(SAMPLE_SALES)))
+
+
+@pytest.mark.parametrize("question", [
+    "Which month had the highest sales?",
+    "Which order has the largest sales?",
+    "On which date were sales lowest?",
+    "What was the biggest drop in sales?",
+])
+def test_label_and_unmatched_superlative_questions_fall_back(matcher, question):
+    assert matcher.match(question) is None
+
+
+@pytest.mark.parametrize("question", [
+    "What is the total sales tax if the tax rate is 10% for the North region?",
+    "What is the 10% tax on total sales in East?",
+    "What is the total number of sales?",
+    "What is the sum of squared sales?",
+    "What is the average daily sales?",
+    "What is the median sales change?",
+    "What is the total sales growth?",
+])
+def test_filtered_and_compound_questions_fall_back(matcher, question):
+    assert matcher.match(question) is None
+
+
+@pytest.mark.parametrize("question, answer", [
+    ("What is the maximum sales?", 220),
+    ("What is the highest sales?", 220),
+    ("What is the total sales?", 1140),
+    ("What is the total sales across all regions?", 1140),
+    ("What is the median sales amount across all orders?", 140),
+    ("What is the total sales tax if the tax rate is 10%?", 114),
+    ("Which region has the highest total sales?", "West"),
+])
+def test_plain_questions_are_answered(matcher, question, answer):
+    assert matcher.match(question).answer == answer